@@ -0,0 +1,74 @@
+"""
+豆瓣片单页解析基准测试
+
+使用 fixtures 中保存的片单页 HTML，对比插件中各解析方式（BeautifulSoup、lxml、正则）
+的耗时和内存峰值，并校验各方式的解析结果与 BeautifulSoup 一致。需要在 MoviePilot
+后端目录下运行，以便导入 app 包：
+
+    cd /path/to/MoviePilot
+    python /path/to/MoviePilot-Plugins/benchmarks/doubandoulist/bench_extract.py
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+sys.path.insert(0, str(BENCH_DIR.parents[1] / "plugins.v2"))
+
+from doubandoulist import DOULIST_EXTRACTORS  # noqa: E402
+
+Extractor = Callable[[str], Tuple[List[Tuple[str, str]], int]]
+
+
+def bench(extractor: Extractor, html: str, rounds: int):
+    """
+    返回 (最佳耗时ms, 平均耗时ms, 内存峰值KB)
+    """
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        extractor(html)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    extractor(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), sum(timings) / len(timings), peak / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--rounds", type=int, default=50)
+    arg_parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=sorted(DOULIST_EXTRACTORS),
+        default=sorted(DOULIST_EXTRACTORS),
+    )
+    args = arg_parser.parse_args()
+
+    print(
+        f"{'fixture':<24}{'items':>6}  {'backend':<8}"
+        f"{'best ms':>10}{'mean ms':>10}{'peak KB':>10}"
+    )
+    for fixture in sorted(FIXTURES_DIR.glob("*.html")):
+        html = fixture.read_text(encoding="utf-8")
+        expected = DOULIST_EXTRACTORS["bs4"](html)
+        for name in args.backends:
+            extractor = DOULIST_EXTRACTORS[name]
+            if extractor(html) != expected:
+                raise SystemExit(f"{fixture.name}: {name} 解析结果与 bs4 不一致")
+            best, mean, peak = bench(extractor, html, args.rounds)
+            print(
+                f"{fixture.name:<24}{len(expected[0]):>6}  {name:<8}"
+                f"{best:>10.2f}{mean:>10.2f}{peak:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+豆瓣榜单Plus处理流程基准测试
+
+使用 fixtures 中的 RSS 内容回放完整的榜单处理流程，媒体识别、媒体库检查和订阅
+由本地替身按设定的延迟模拟，不访问网络也不写入 MoviePilot 数据库。按阶段输出调用次数、
+吞吐量、p50/p95 耗时以及整轮的内存峰值，可对比串行、并发和识别缓存命中等模式。
+
+fixtures 中的 RSS 是按 RSSHub 豆瓣路由的输出格式生成的合成数据，条目数量与实际榜单一致，
+标题、导演和主演等为占位文本，结果只适合比较不同模式和版本之间的相对耗时。需要贴近实际
+的数据时，可将 RSSHub 实际返回的内容按同样的文件名保存到 fixtures 中替换：
+
+    cd /path/to/MoviePilot
+    python /path/to/MoviePilot-Plugins/benchmarks/doubanrankplus/bench_pipeline.py \\
+        --modes serial concurrent cached --workers 4 --recognize-ms 30
+"""
+import argparse
+import hashlib
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import requests
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+sys.path.insert(0, str(BENCH_DIR.parents[1] / "plugins.v2"))
+
+import doubanrankplus2 as engine  # noqa: E402
+from app.core.context import MediaInfo  # noqa: E402
+from app.schemas.types import MediaType  # noqa: E402
+
+FEED_URL_PREFIX = "https://bench.local/"
+STAGES = ["fetch", "parse", "recognize", "no_exists", "subscribe"]
+
+
+class StageRecorder:
+    """
+    记录各阶段每次调用的耗时
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.timings[stage].append(seconds)
+
+    def timed(self, stage: str, func: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+
+        return wrapper
+
+
+class Latency:
+    """
+    按设定的毫秒数模拟上游延迟，带 ±20% 的固定种子抖动
+    """
+
+    def __init__(self, ms: float, seed: int):
+        self._seconds = ms / 1000
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        if self._seconds <= 0:
+            return
+        with self._lock:
+            jitter = self._random.uniform(0.8, 1.2)
+        time.sleep(self._seconds * jitter)
+
+
+def _stable_int(text: str) -> int:
+    return int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+
+
+def build_stand_ins(args, recorder: StageRecorder) -> Dict[str, Any]:
+    """
+    构造替换插件模块中上游依赖的替身类
+    """
+    fetch_latency = Latency(args.fetch_ms, 1)
+    recognize_latency = Latency(args.recognize_ms, 2)
+    exists_latency = Latency(args.exists_ms, 3)
+    subscribe_latency = Latency(args.subscribe_ms, 4)
+
+    def get_res(url: str, *_args, **_kwargs) -> requests.Response:
+        fetch_latency.sleep()
+        response = requests.Response()
+        response.status_code = 200
+        response._content = (
+            FIXTURES_DIR / f"{url[len(FEED_URL_PREFIX):]}.xml"
+        ).read_bytes()
+        return response
+
+    def recognize_media(meta=None, mtype=None, tmdbid=None, **_kwargs):
+        recognize_latency.sleep()
+        title = meta.name or meta.org_string or ""
+        if not tmdbid and _stable_int(title) % 100 < args.unrecognized_ratio * 100:
+            return None
+        mediainfo = MediaInfo()
+        mediainfo.title = title
+        mediainfo.year = meta.year
+        mediainfo.type = mtype or (
+            meta.type if meta.type == MediaType.TV else MediaType.MOVIE
+        )
+        mediainfo.tmdb_id = tmdbid or _stable_int(title) % 1000000
+        mediainfo.vote_average = 8.0
+        mediainfo.number_of_seasons = 2
+        return mediainfo
+
+    def get_no_exists_info(meta=None, mediainfo=None, **_kwargs):
+        exists_latency.sleep()
+        if mediainfo.type == MediaType.TV:
+            return False, {mediainfo.tmdb_id: {1: None, 2: None}}
+        return False, {}
+
+    def subscribe_exists(mediainfo=None, meta=None, **_kwargs) -> bool:
+        subscribe_latency.sleep()
+        return False
+
+    def subscribe_add(**_kwargs):
+        subscribe_latency.sleep()
+        return 1, ""
+
+    def list_by_tmdbid(tmdbid, season=None) -> list:
+        subscribe_latency.sleep()
+        return []
+
+    def stand_in(name: str, **methods: Callable) -> type:
+        return type(
+            name,
+            (),
+            {
+                "__init__": lambda self, *_args, **_kwargs: None,
+                **{k: staticmethod(v) for k, v in methods.items()},
+            },
+        )
+
+    return {
+        "RequestUtils": stand_in(
+            "RequestUtils", get_res=recorder.timed("fetch", get_res)
+        ),
+        "MediaChain": stand_in(
+            "MediaChain",
+            recognize_media=recorder.timed("recognize", recognize_media),
+        ),
+        "DownloadChain": stand_in(
+            "DownloadChain",
+            get_no_exists_info=recorder.timed("no_exists", get_no_exists_info),
+        ),
+        "SubscribeChain": stand_in(
+            "SubscribeChain",
+            exists=recorder.timed("subscribe", subscribe_exists),
+            add=recorder.timed("subscribe", subscribe_add),
+        ),
+        "SubscribeOper": stand_in(
+            "SubscribeOper",
+            list_by_tmdbid=recorder.timed("subscribe", list_by_tmdbid),
+        ),
+        "DoubanApi": stand_in("DoubanApi"),
+    }
+
+
+class BenchPlugin(engine.DoubanRankPlus2):
+    """
+    插件数据保存在内存和临时目录中，不连接 MoviePilot 数据库
+    """
+
+    def __init__(self, data_path: Path, chain):
+        # 不调用父类初始化
+        self._data: Dict[str, Any] = {}
+        self._data_path = data_path
+        self.chain = chain
+
+    def get_data(self, key: str = None, plugin_id: str = None) -> Any:
+        return self._data.get(key)
+
+    def save_data(self, key: str, value: Any, plugin_id: str = None):
+        self._data[key] = value
+
+    def del_data(self, key: str, plugin_id: str = None) -> Any:
+        return self._data.pop(key, None)
+
+    def get_data_path(self, plugin_id: str = None) -> Path:
+        return self._data_path
+
+    def update_config(self, config: dict, plugin_id: str = None) -> bool:
+        return True
+
+
+def reset_shared_state():
+    """
+    清空进程内共享的RSS内容和识别缓存，每轮都重新获取和识别
+    """
+    engine._shared_feed_cache = engine.SharedFeedCache()
+    engine._shared_recognize_cache = engine.RecognizeCache()
+    engine._shared_rate_limiters.clear()
+
+
+def run_round(
+    args, mode: str, recorder: StageRecorder
+) -> Tuple[float, int, Dict[str, List[float]]]:
+    """
+    运行一轮完整流程，返回 (耗时秒, 处理条目数, 各阶段耗时)
+    """
+    reset_shared_state()
+    with tempfile.TemporaryDirectory() as tmp:
+        plugin = BenchPlugin(Path(tmp), engine.MediaChain())
+        plugin.init_plugin(
+            {
+                "rss_addrs": "\n".join(
+                    FEED_URL_PREFIX + fixture for fixture in args.fixtures
+                ),
+                "process_workers": str(
+                    args.workers if mode != "serial" else 1
+                ),
+                "is_only_movies": args.only_movies,
+            }
+        )
+        if not args.rate_limit:
+            plugin._rate_limiters = {}
+        start_task = plugin._DoubanRankPlus2__start_task
+
+        if mode == "cached":
+            # 预热识别缓存，之后清空历史、榜单状态和共享的RSS内容，只保留识别缓存
+            start_task()
+            plugin._history.clear()
+            plugin.save_data("feed_cache", {})
+            plugin.save_data("feed_snapshot", {})
+            engine._shared_feed_cache = engine.SharedFeedCache()
+
+        recorder.timings.clear()
+        start = time.perf_counter()
+        start_task()
+        elapsed = time.perf_counter() - start
+        timings = {k: list(v) for k, v in recorder.timings.items()}
+        total = plugin._history.count()
+        plugin.stop_service()
+    return elapsed, total, timings
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["serial", "concurrent", "cached"],
+        default=["serial", "concurrent", "cached"],
+    )
+    arg_parser.add_argument(
+        "--fixtures",
+        nargs="+",
+        default=sorted(p.stem for p in FIXTURES_DIR.glob("*.xml")),
+        help="fixtures 目录中的 RSS 文件名（不含扩展名）",
+    )
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    arg_parser.add_argument("--workers", type=int, default=4)
+    arg_parser.add_argument("--fetch-ms", type=float, default=50)
+    arg_parser.add_argument("--recognize-ms", type=float, default=20)
+    arg_parser.add_argument("--exists-ms", type=float, default=5)
+    arg_parser.add_argument("--subscribe-ms", type=float, default=2)
+    arg_parser.add_argument(
+        "--unrecognized-ratio",
+        type=float,
+        default=0.05,
+        help="按标题固定比例模拟未识别的条目",
+    )
+    arg_parser.add_argument(
+        "--rate-limit", action="store_true", help="启用插件的上游限流"
+    )
+    arg_parser.add_argument(
+        "--only-movies", action="store_true", help="启用插件的仅订阅电影"
+    )
+    args = arg_parser.parse_args()
+
+    # 解析阶段直接计时插件的解析方法
+    recorder = StageRecorder()
+    engine.DoubanRankPlus2._DoubanRankPlus2__parse_rss_info = staticmethod(
+        recorder.timed(
+            "parse", engine.DoubanRankPlus2._DoubanRankPlus2__parse_rss_info
+        )
+    )
+    for name, stand_in in build_stand_ins(args, recorder).items():
+        setattr(engine, name, stand_in)
+
+    print(f"fixtures: {', '.join(args.fixtures)}  rounds: {args.rounds}")
+    for mode in args.modes:
+        elapsed_list = []
+        items = 0
+        timings: Dict[str, List[float]] = defaultdict(list)
+        for _ in range(args.rounds):
+            elapsed, items, round_timings = run_round(args, mode, recorder)
+            elapsed_list.append(elapsed)
+            for stage, values in round_timings.items():
+                timings[stage].extend(values)
+
+        # 单独运行一轮统计内存峰值，避免 tracemalloc 影响耗时
+        tracemalloc.start()
+        run_round(args, mode, recorder)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        best = min(elapsed_list)
+        print(
+            f"\n[{mode}] items: {items}  best: {best:.2f}s  "
+            f"mean: {sum(elapsed_list) / len(elapsed_list):.2f}s  "
+            f"items/s: {items / best:.1f}  peak: {peak / 1024 / 1024:.1f}MB"
+        )
+        print(
+            f"{'stage':<12}{'calls':>8}{'total s':>10}"
+            f"{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        )
+        for stage in STAGES:
+            values = timings.get(stage)
+            if not values:
+                print(f"{stage:<12}{0:>8}")
+                continue
+            total = sum(values)
+            print(
+                f"{stage:<12}{len(values):>8}{total:>10.2f}"
+                f"{len(values) / total if total else 0:>10.1f}"
+                f"{percentile(values, 0.5) * 1000:>10.2f}"
+                f"{percentile(values, 0.95) * 1000:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+豆瓣榜单Plus RSS解析基准测试
+
+对比旧版 xml.dom.minidom 解析与插件当前使用的流式解析，输出耗时和内存峰值，
+并校验两种解析结果一致。fixtures 中的 RSS 是按 RSSHub 输出格式生成的合成数据，
+详见 bench_pipeline.py 的说明。需要在 MoviePilot 后端目录下运行，以便导入 app 包：
+
+    cd /path/to/MoviePilot
+    python /path/to/MoviePilot-Plugins/benchmarks/doubanrankplus/bench_rss_parse.py
+"""
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+import xml.dom.minidom
+from pathlib import Path
+from typing import Callable, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+sys.path.insert(0, str(BENCH_DIR.parents[1] / "plugins.v2"))
+
+from doubanrankplus2 import DoubanRankPlus2, RssInfo  # noqa: E402
+
+
+def _tag_value(item, tag_name: str) -> str:
+    """
+    与 DomUtils.tag_value 相同的取值方式
+    """
+    tags = item.getElementsByTagName(tag_name)
+    if tags and tags[0].firstChild:
+        return tags[0].firstChild.data
+    return ""
+
+
+def parse_minidom(content: bytes) -> List[RssInfo]:
+    """
+    旧版基于 xml.dom.minidom 的解析
+    """
+    ret_array: List[RssInfo] = []
+    dom_tree = xml.dom.minidom.parseString(content.decode("utf-8"))
+    root_node = dom_tree.documentElement
+    for item in root_node.getElementsByTagName("item"):
+        title = _tag_value(item, "title")
+        link = _tag_value(item, "link")
+        if not title and not link:
+            continue
+        found_doubanid = re.findall(r"/(\d+)/", str(link) or "")
+        doubanid = found_doubanid[0] if found_doubanid else None
+        year = _tag_value(item, "year")
+        if not year:
+            description = _tag_value(item, "description")
+            description = re.sub(r"评价数.*?<br>", "", str(description) or "")
+            description = re.sub(r"<img.*?>", "", description)
+            found_year = re.findall(r"\b(19\d{2}|20\d{2})\b", description)
+            year = found_year[0] if found_year else None
+        mtype = _tag_value(item, "type")
+        ret_array.append(
+            {
+                "title": str(title),
+                "link": str(link),
+                "mtype": str(mtype),
+                "year": str(year) if year else None,
+                "doubanid": str(doubanid) if doubanid else None,
+            }
+        )
+    return ret_array
+
+
+def parse_stream(content: bytes) -> List[RssInfo]:
+    """
+    插件当前的流式解析
+    """
+    return DoubanRankPlus2._DoubanRankPlus2__parse_rss_info(content)
+
+
+def bench(
+    parser: Callable[[bytes], List[RssInfo]], content: bytes, rounds: int
+):
+    """
+    返回 (最佳耗时ms, 平均耗时ms, 内存峰值KB)
+    """
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        parser(content)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    parser(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), sum(timings) / len(timings), peak / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--rounds", type=int, default=50)
+    args = arg_parser.parse_args()
+
+    print(
+        f"{'fixture':<24}{'items':>6}  {'parser':<8}"
+        f"{'best ms':>10}{'mean ms':>10}{'peak KB':>10}"
+    )
+    for fixture in sorted(FIXTURES_DIR.glob("*.xml")):
+        content = fixture.read_bytes()
+        expected = parse_minidom(content)
+        actual = parse_stream(content)
+        if expected != actual:
+            raise SystemExit(f"{fixture.name}: 解析结果不一致")
+        for name, parser in (("minidom", parse_minidom), ("stream", parse_stream)):
+            best, mean, peak = bench(parser, content, args.rounds)
+            print(
+                f"{fixture.name:<24}{len(expected):>6}  {name:<8}"
+                f"{best:>10.2f}{mean:>10.2f}{peak:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
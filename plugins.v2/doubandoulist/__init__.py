@@ -1,6 +1,9 @@
 import datetime
+import hashlib
+import html as htmllib
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from threading import Lock
 from typing import Optional, Any, List, Dict, Tuple
@@ -11,6 +14,11 @@ from bs4 import BeautifulSoup
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
 from app import schemas
 from app.chain.media import MediaChain
 from app.db.subscribe_oper import SubscribeOper
@@ -30,6 +38,155 @@ from app.plugins import _PluginBase
 lock = Lock()
 
 
+class HostRateLimiter:
+    """
+    同一主机的请求限流，多个线程共享时按最小间隔依次放行
+    """
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._lock = Lock()
+        self._next_time = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def set_interval(self, interval: float):
+        with self._lock:
+            self._interval = interval
+
+
+# 豆瓣请求限流，所有片单共享，间隔与旧版本逐页抓取时的2秒一致，可在配置中调整
+_douban_limiter = HostRateLimiter(2)
+
+
+class DoubanSubjectCache:
+    """
+    豆瓣条目详情和豆瓣ID到TMDB ID映射的缓存，只缓存获取到的结果
+    """
+
+    # 获取到结果的缓存时间（秒）
+    _ttl: int = 7 * 24 * 3600
+
+    def __init__(self, data: Optional[dict] = None):
+        now = time.time()
+        # 旧版本缓存了未获取到的结果，加载时丢弃
+        self._entries: Dict[str, dict] = {
+            key: entry for key, entry in (data or {}).items()
+            if isinstance(entry, dict) and entry.get("value") and entry.get("expire", 0) > now
+        }
+        self.hits = 0
+
+    def get(self, kind: str, doubanid: str) -> Tuple[bool, Any]:
+        """
+        获取缓存，返回 (是否命中, 缓存的结果)
+        """
+        entry = self._entries.get(f"{kind}:{doubanid}")
+        if not entry or entry.get("expire", 0) <= time.time():
+            return False, None
+        self.hits += 1
+        return True, entry.get("value")
+
+    def set(self, kind: str, doubanid: str, value: Any):
+        """
+        缓存获取到的结果，结果为空时不缓存：未获取到可能是条目不存在，也可能是被风控或网络异常，
+        无法区分，下次运行时重新获取
+        """
+        if not value:
+            return
+        self._entries[f"{kind}:{doubanid}"] = {
+            "value": value,
+            "expire": time.time() + self._ttl
+        }
+
+    def to_dict(self) -> Dict[str, dict]:
+        now = time.time()
+        return {key: entry for key, entry in self._entries.items() if entry.get("expire", 0) > now}
+
+
+_SUBJECT_PATTERN = re.compile(r"movie\.douban\.com/subject/(\d+)")
+_ITEM_PATTERN = re.compile(r"""<div\s[^>]*?class=["'](?:[^"']*\s)?doulist-item(?:\s[^"']*)?["']""")
+_TITLE_LINK_PATTERN = re.compile(
+    r"""<div\s[^>]*?class=["'](?:[^"']*\s)?title(?:\s[^"']*)?["'][^>]*>.*?<a\s[^>]*?href=["']([^"']*)["'][^>]*>(.*?)</a>""",
+    re.S)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def extract_items_bs4(html: str) -> Tuple[List[Tuple[str, str]], int]:
+    """
+    使用 BeautifulSoup 解析片单页，返回 (豆瓣ID, 标题) 列表和页面中的条目总数
+    """
+    items = []
+    soup = BeautifulSoup(html, "html.parser")
+    items_div = soup.find_all("div", class_="doulist-item")
+    for item in items_div:
+        title_div = item.find("div", class_="title")
+        if not title_div:
+            continue
+        a_tag = title_div.find("a")
+        if not a_tag or not a_tag.get("href"):
+            continue
+        match = _SUBJECT_PATTERN.search(a_tag.get("href"))
+        if match:
+            items.append((match.group(1), a_tag.get_text(strip=True)))
+    return items, len(items_div)
+
+
+def extract_items_lxml(html: str) -> Tuple[List[Tuple[str, str]], int]:
+    """
+    使用 lxml 解析片单页，结果与 BeautifulSoup 一致
+    """
+    items = []
+    root = etree.HTML(html)
+    if root is None:
+        return items, 0
+    items_div = root.xpath("//div[contains(concat(' ', normalize-space(@class), ' '), ' doulist-item ')]")
+    for item in items_div:
+        title_divs = item.xpath("(.//div[contains(concat(' ', normalize-space(@class), ' '), ' title ')])[1]")
+        if not title_divs:
+            continue
+        a_tags = title_divs[0].xpath("(.//a)[1]")
+        if not a_tags or not a_tags[0].get("href"):
+            continue
+        match = _SUBJECT_PATTERN.search(a_tags[0].get("href"))
+        if match:
+            items.append((match.group(1), "".join(text.strip() for text in a_tags[0].itertext())))
+    return items, len(items_div)
+
+
+def extract_items_regex(html: str) -> Tuple[List[Tuple[str, str]], int]:
+    """
+    按条目起始位置切分页面，用正则提取每个条目标题中的链接，不构建文档树
+    """
+    items = []
+    starts = [match.start() for match in _ITEM_PATTERN.finditer(html)]
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(html)
+        title_match = _TITLE_LINK_PATTERN.search(html, start, end)
+        if not title_match:
+            continue
+        match = _SUBJECT_PATTERN.search(htmllib.unescape(title_match.group(1)))
+        if match:
+            title = "".join(
+                htmllib.unescape(text).strip() for text in _TAG_PATTERN.split(title_match.group(2)))
+            items.append((match.group(1), title))
+    return items, len(starts)
+
+
+# 片单页解析方式，BeautifulSoup 作为其他方式失败时的兜底
+DOULIST_EXTRACTORS = {
+    "regex": extract_items_regex,
+    "bs4": extract_items_bs4,
+}
+if etree is not None:
+    DOULIST_EXTRACTORS["lxml"] = extract_items_lxml
+
+
 class DoubanDoulist(_PluginBase):
     # 插件名称
     plugin_name = "豆瓣片单订阅下载"
@@ -52,6 +209,8 @@ class DoubanDoulist(_PluginBase):
 
     # 私有变量
     _doulist_base_url: str = "https://www.douban.com/doulist/%s/"
+    # 片单每页条目数
+    _page_size: int = 25
     _scheduler: Optional[BackgroundScheduler] = None
 
     # 配置属性
@@ -66,7 +225,14 @@ class DoubanDoulist(_PluginBase):
     _min_rating: str = ""
     _clear: bool = False
     _clearflag: bool = False
+    _full_crawl: bool = False
+    _full_crawl_flag: bool = False
     _search_download = False
+    _crawl_workers: int = 4
+    # 豆瓣片单分页请求的最小间隔（秒）
+    _page_interval: float = 2
+    # 片单页解析方式，见 DOULIST_EXTRACTORS
+    _extract_backend: str = "lxml" if etree is not None else "regex"
 
     def init_plugin(self, config: dict = None):
         # 停止现有任务
@@ -84,7 +250,11 @@ class DoubanDoulist(_PluginBase):
             self._min_rating = config.get("min_rating")
             self._onlyonce = config.get("onlyonce")
             self._clear = config.get("clear")
+            self._full_crawl = config.get("full_crawl")
             self._search_download = config.get("search_download")
+            self._crawl_workers = max(1, self._get_number_config(config, "crawl_workers", 4, int))
+            self._page_interval = max(0.0, self._get_number_config(config, "page_interval", 2, float))
+        _douban_limiter.set_interval(self._page_interval)
 
         if self._enabled or self._onlyonce:
             if self._onlyonce:
@@ -100,12 +270,28 @@ class DoubanDoulist(_PluginBase):
                     self._scheduler.print_jobs()
                     self._scheduler.start()
 
-            if self._onlyonce or self._clear:
+            if self._onlyonce or self._clear or self._full_crawl:
                 self._onlyonce = False
                 self._clearflag = self._clear
                 self._clear = False
+                self._full_crawl_flag = self._full_crawl
+                self._full_crawl = False
                 self.__update_config()
 
+    @staticmethod
+    def _get_number_config(config: dict, key: str, default: float, cast: type):
+        """
+        读取数字配置，未配置或为空时使用默认值，格式不正确时记录警告并使用默认值
+        """
+        value = str(config.get(key) if config.get(key) is not None else "").strip()
+        if not value:
+            return default
+        try:
+            return cast(value)
+        except ValueError:
+            logger.warn(f"配置项 {key} 的值 {value} 不是有效的数字，使用默认值 {default}")
+            return default
+
     def get_state(self) -> bool:
         return self._enabled
 
@@ -174,9 +360,10 @@ class DoubanDoulist(_PluginBase):
                     {
                         'component': 'VRow',
                         'content': [
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 6}, 'content': [{'component': 'VTextField', 'props': {'model': 'min_year', 'label': '上映年份筛选 (>=)', 'placeholder': '例如：2020'}}]},
+                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VTextField', 'props': {'model': 'min_year', 'label': '上映年份筛选 (>=)', 'placeholder': '例如：2020'}}]},
                             # 文案同步更新，提示用户这是按 TMDB 评分过滤
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 6}, 'content': [{'component': 'VTextField', 'props': {'model': 'min_rating', 'label': 'TMDB 最低评分筛选 (>=)', 'placeholder': '例如：7.6，将采用 TMDB 评分进行过滤'}}]}
+                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VTextField', 'props': {'model': 'min_rating', 'label': 'TMDB 最低评分筛选 (>=)', 'placeholder': '例如：7.6，将采用 TMDB 评分进行过滤'}}]},
+                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VTextField', 'props': {'model': 'crawl_workers', 'label': '片单分页并发数', 'placeholder': '默认4，设为1则逐页抓取', 'hint': '所有分页共用请求间隔，需同时调低分页请求间隔才能明显提速', 'persistent-hint': True}}]}
                         ]
                     },
                     {
@@ -202,7 +389,9 @@ class DoubanDoulist(_PluginBase):
                     {
                         'component': 'VRow',
                         'content': [
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VSwitch', 'props': {'model': 'clear', 'label': '清理历史同步记录'}}]}
+                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VSwitch', 'props': {'model': 'clear', 'label': '清理历史同步记录'}}]},
+                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VSwitch', 'props': {'model': 'full_crawl', 'label': '下次全量抓取片单', 'hint': '片单调整过顺序或删除过条目时开启一次', 'persistent-hint': True}}]},
+                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VTextField', 'props': {'model': 'page_interval', 'label': '片单分页请求间隔（秒）', 'placeholder': '默认2，设为0则不限制', 'hint': '调低间隔并发抓取才能提速，间隔过短容易触发豆瓣频率限制，建议配合 Cookie 使用', 'persistent-hint': True}}]}
                         ]
                     }
                 ]
@@ -218,7 +407,10 @@ class DoubanDoulist(_PluginBase):
             "min_year": "",
             "min_rating": "",
             "clear": False,
-            "search_download": False
+            "full_crawl": False,
+            "search_download": False,
+            "crawl_workers": 4,
+            "page_interval": 2
         }
 
     def get_page(self) -> List[dict]:
@@ -275,7 +467,10 @@ class DoubanDoulist(_PluginBase):
             "min_year": self._min_year,
             "min_rating": self._min_rating,
             "clear": self._clear,
-            "search_download": self._search_download
+            "full_crawl": self._full_crawl,
+            "search_download": self._search_download,
+            "crawl_workers": self._crawl_workers,
+            "page_interval": self._page_interval
         })
 
     def delete_history(self, doubanid: str, apikey: str):
@@ -286,8 +481,28 @@ class DoubanDoulist(_PluginBase):
             return schemas.Response(success=False, message="未找到历史记录")
         historys = [h for h in historys if h.get("doubanid") != doubanid]
         self.save_data('history', historys)
+        history_index = self._load_history_index(historys)
+        history_index.pop(doubanid, None)
+        self.save_data('history_index', history_index)
         return schemas.Response(success=True, message="删除成功")
 
+    def _load_history_index(self, history: List[dict]) -> Dict[str, str]:
+        """
+        读取历史记录的豆瓣ID索引，与历史记录数量不一致时按历史记录重建
+        """
+        history_index = self.get_data('history_index') or {}
+        if len(history_index) != len(history):
+            history_index = {h.get("doubanid"): h.get("time") for h in history if h.get("doubanid")}
+        return history_index
+
+    @staticmethod
+    def _append_history(history: List[dict], history_index: Dict[str, str], record: dict):
+        """
+        添加历史记录并同步更新豆瓣ID索引
+        """
+        history.append(record)
+        history_index[record.get("doubanid")] = record.get("time")
+
     def stop_service(self):
         try:
             if self._scheduler:
@@ -298,65 +513,195 @@ class DoubanDoulist(_PluginBase):
         except Exception as e:
             logger.error(f"退出插件失败：{str(e)}")
 
-    def _parse_doulist(self, doulist_id: str) -> List[Tuple[str, str]]:
-        items = []
-        start = 0
-        headers = {
+    def _get_session(self) -> requests.Session:
+        """
+        创建抓取片单的会话，Cookie 放入会话中，豆瓣返回的 Cookie 后续请求继续使用
+        """
+        session = requests.Session()
+        session.headers.update({
             "User-Agent": settings.USER_AGENT or "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
             "Referer": "https://www.douban.com/"
-        }
-        if self._cookie:
-            headers["Cookie"] = self._cookie
-
-        while True:
-            url = f"{self._doulist_base_url % doulist_id}?start={start}"
-            logger.info(f"正在抓取片单 {doulist_id}，分页参数 start={start}")
+        })
+        for part in (self._cookie or "").split(";"):
+            if "=" in part:
+                name, value = part.split("=", 1)
+                session.cookies.set(name.strip(), value.strip(), domain=".douban.com")
+        return session
+
+    def _fetch_doulist_page(self, session: requests.Session, doulist_id: str, start: int) -> Optional[str]:
+        """
+        限流后获取片单的一页，失败时返回 None
+        """
+        url = f"{self._doulist_base_url % doulist_id}?start={start}"
+        logger.info(f"正在抓取片单 {doulist_id}，分页参数 start={start}")
+        _douban_limiter.acquire()
+        try:
+            res = session.get(url, timeout=15)
+        except Exception as e:
+            logger.error(f"豆瓣片单请求异常: {str(e)}")
+            return None
+        if res.status_code != 200:
+            logger.error(f"豆瓣片单请求失败，状态码: {res.status_code}")
+            return None
+        return res.text
+
+    def _extract_doulist_items(self, html: str) -> Tuple[List[Tuple[str, str]], int]:
+        """
+        解析片单页中的影视条目，返回 (豆瓣ID, 标题) 列表和页面中的条目总数，
+        快速解析出错或未找到条目时改用 BeautifulSoup 解析
+        """
+        backend = self._extract_backend if self._extract_backend in DOULIST_EXTRACTORS else "bs4"
+        if backend != "bs4":
             try:
-                res = requests.get(url, headers=headers, timeout=15)
-                if res.status_code != 200:
-                    logger.error(f"豆瓣片单请求失败，状态码: {res.status_code}")
-                    break
-                
-                soup = BeautifulSoup(res.text, "html.parser")
-                items_div = soup.find_all("div", class_="doulist-item")
-                if not items_div:
-                    break
-
-                page_has_movie = False
-                for item in items_div:
-                    title_div = item.find("div", class_="title")
-                    if not title_div:
-                        continue
-                    a_tag = title_div.find("a")
-                    if not a_tag or not a_tag.get("href"):
-                        continue
+                items, item_count = DOULIST_EXTRACTORS[backend](html)
+                if item_count:
+                    return items, item_count
+            except Exception as e:
+                logger.warn(f"片单页 {backend} 解析异常，改用 BeautifulSoup 解析: {str(e)}")
+        return extract_items_bs4(html)
+
+    def _get_doulist_page_count(self, html: str) -> int:
+        """
+        从第一页的分页栏读取总页数，无法读取时返回 0
+        """
+        match = re.search(r'data-total-page="(\d+)"', html)
+        if match:
+            return int(match.group(1))
+        paginator = html.find('class="paginator"')
+        if paginator == -1:
+            return 0
+        starts = [int(start) for start in re.findall(r"[?&]start=(\d+)", html[paginator:])]
+        return max(starts) // self._page_size + 1 if starts else 0
 
-                    href = a_tag.get("href")
-                    if "movie.douban.com/subject" in href:
-                        match = re.search(r"subject/(\d+)", href)
-                        if match:
-                            db_id = match.group(1)
-                            title = a_tag.get_text(strip=True)
-                            items.append((db_id, title))
-                            page_has_movie = True
+    @staticmethod
+    def _get_doulist_total(html: str) -> Optional[int]:
+        """
+        从第一页的筛选栏读取片单条目总数，无法读取时返回 None
+        """
+        match = re.search(r"全部\s*<span>\s*\(\s*(\d+)\s*\)", html)
+        return int(match.group(1)) if match else None
 
-                if not page_has_movie or len(items_div) < 25:
-                    break
+    @staticmethod
+    def _get_doulist_state(items: List[Tuple[str, str]], last_page: List[Tuple[str, str]], head: str,
+                           page_count: int, total: Optional[int]) -> dict:
+        """
+        片单抓取状态，记录第一页摘要、总数、分页数、末页条目和全部条目，下次只抓取变化的末尾分页
+        """
+        return {
+            "head": head,
+            "total": total,
+            "page_count": page_count,
+            "last_ids": [db_id for db_id, _ in last_page],
+            "prefix": len(items) - len(last_page),
+            "items": [list(item) for item in items],
+            "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
 
-                start += 25
-                time.sleep(2)
+    def _parse_doulist(self, doulist_id: str, state: Optional[dict] = None) -> Tuple[List[Tuple[str, str]], Optional[dict]]:
+        """
+        抓取片单的全部影视条目，有上次的抓取状态时，第一页未变化则只抓取末尾变化的分页，
+        返回条目列表和新的抓取状态，未能完整抓取时状态为 None
+        """
+        session = self._get_session()
+        try:
+            html = self._fetch_doulist_page(session, doulist_id, 0)
+            if not html:
+                return [], None
+            try:
+                items, item_count = self._extract_doulist_items(html)
             except Exception as e:
                 logger.error(f"解析片单页出现异常: {str(e)}")
+                return [], None
+            if not items or item_count < self._page_size:
+                return items, None
+
+            page_count = self._get_doulist_page_count(html)
+            if page_count <= 1:
+                return items + self._parse_doulist_sequential(session, doulist_id), None
+
+            total = self._get_doulist_total(html)
+            head = hashlib.md5("\n".join(db_id for db_id, _ in items).encode()).hexdigest()
+            if state and state.get("head") == head and 1 < state.get("page_count", 0) <= page_count:
+                if total is not None and total == state.get("total") and page_count == state["page_count"]:
+                    logger.info(f"片单 {doulist_id} 未变化，使用上次抓取的 {len(state['items'])} 个条目")
+                    return [tuple(item) for item in state["items"]], state
+
+                # 片单通常只在末尾追加，从上次的末页开始抓取，末页条目未变时与上次的条目合并
+                tail_starts = list(range((state["page_count"] - 1) * self._page_size,
+                                         page_count * self._page_size, self._page_size))
+                pages = self._fetch_doulist_pages(session, doulist_id, tail_starts)
+                last_ids = state.get("last_ids") or []
+                if len(pages) == len(tail_starts) \
+                        and [db_id for db_id, _ in pages[0][:len(last_ids)]] == last_ids:
+                    logger.info(f"片单 {doulist_id} 第一页和末页未变化，只抓取了末尾 {len(pages)} 页")
+                    items = [tuple(item) for item in state["items"][:state.get("prefix", 0)]]
+                    items += [item for page in pages for item in page]
+                    return items, self._get_doulist_state(items, pages[-1], head, page_count, total)
+                logger.info(f"片单 {doulist_id} 末页与上次不一致，重新抓取全部分页")
+
+            starts = [page * self._page_size for page in range(1, page_count)]
+            pages = self._fetch_doulist_pages(session, doulist_id, starts)
+            items += [item for page in pages for item in page]
+            if len(pages) < len(starts):
+                return items, None
+            return items, self._get_doulist_state(items, pages[-1], head, page_count, total)
+        finally:
+            session.close()
+
+    def _parse_doulist_sequential(self, session: requests.Session, doulist_id: str) -> List[Tuple[str, str]]:
+        """
+        无法读取总页数时从第二页开始逐页抓取，直到某页不足一页或没有影视条目
+        """
+        items = []
+        start = 0
+        while True:
+            start += self._page_size
+            html = self._fetch_doulist_page(session, doulist_id, start)
+            if not html:
+                break
+            try:
+                page_items, item_count = self._extract_doulist_items(html)
+            except Exception as e:
+                logger.error(f"解析片单页出现异常: {str(e)}")
+                break
+            items.extend(page_items)
+            if not page_items or item_count < self._page_size:
                 break
-
         return items
 
+    def _fetch_doulist_pages(self, session: requests.Session, doulist_id: str,
+                             starts: List[int]) -> List[List[Tuple[str, str]]]:
+        """
+        按分页参数并发抓取多个分页，按片单顺序返回每页的条目，某页失败时只返回之前的分页
+        """
+        logger.info(f"片单 {doulist_id} 开始抓取 {len(starts)} 页，并发数 {self._crawl_workers}")
+        with ThreadPoolExecutor(max_workers=max(1, min(self._crawl_workers, len(starts))),
+                                thread_name_prefix="doubandoulist-page") as executor:
+            htmls = list(executor.map(lambda start: self._fetch_doulist_page(session, doulist_id, start), starts))
+
+        pages = []
+        for start, html in zip(starts, htmls, strict=True):
+            if not html:
+                logger.warn(f"片单 {doulist_id} 分页 start={start} 抓取失败，忽略之后的分页")
+                break
+            try:
+                page_items, _ = self._extract_doulist_items(html)
+            except Exception as e:
+                logger.error(f"解析片单页出现异常: {str(e)}")
+                break
+            pages.append(page_items)
+        return pages
+
     def sync(self):
         if not self._doulists:
             logger.warn("未配置豆瓣片单ID，退出同步")
             return
 
         history = [] if self._clearflag else (self.get_data('history') or [])
+        doulist_states = {} if self._full_crawl_flag else (self.get_data('doulist_state') or {})
+        # 豆瓣详情和TMDB ID缓存，所有片单共用
+        subject_cache = DoubanSubjectCache(self.get_data('douban_cache'))
+        history_index = self._load_history_index(history)
         
         mediachain = MediaChain()
         downloadchain = DownloadChain()
@@ -383,12 +728,14 @@ class DoubanDoulist(_PluginBase):
                 break
                 
             logger.info(f"===> 开始同步豆瓣片单: {doulist_id} (绑定定制路径: {custom_path}) <===")
-            parsed_items = self._parse_doulist(doulist_id)
+            parsed_items, doulist_state = self._parse_doulist(doulist_id, doulist_states.get(doulist_id))
+            if doulist_state:
+                doulist_states[doulist_id] = doulist_state
             logger.info(f"片单 {doulist_id} 解析完成，共发现电影/剧集资源 {len(parsed_items)} 个")
 
             for douban_id, raw_title in parsed_items:
                 try:
-                    if douban_id in [h.get("doubanid") for h in history]:
+                    if douban_id in history_index:
                         continue
 
                     if self._batch_size > 0 and processed_new_count >= self._batch_size:
@@ -399,7 +746,13 @@ class DoubanDoulist(_PluginBase):
                     processed_new_count += 1
 
                     meta = MetaInfo(title=raw_title)
-                    douban_info = self.chain.douban_info(doubanid=douban_id)
+                    cached, douban_info = subject_cache.get("info", douban_id)
+                    if not cached:
+                        douban_info = self.chain.douban_info(doubanid=douban_id)
+                        # 只缓存用到的字段
+                        subject_cache.set("info", douban_id, {
+                            key: douban_info[key] for key in ("type", "year", "poster", "intro") if key in douban_info
+                        } if douban_info else None)
                     
                     if not douban_info:
                         logger.warn(f"无法获取到影片 {raw_title} 的豆瓣详情数据，可能被风控或Cookie失效，跳过此片")
@@ -413,7 +766,7 @@ class DoubanDoulist(_PluginBase):
                         try:
                             if db_year and int(db_year) < int(self._min_year):
                                 logger.info(f"影片 {raw_title} 年份为 {db_year}，低于设定的最小年份 {self._min_year}，跳过")
-                                history.append({
+                                self._append_history(history, history_index, {
                                     "action": f"被过滤 (年份 {db_year} < {self._min_year})",
                                     "title": raw_title,
                                     "type": douban_info.get("type", "movie"),
@@ -430,11 +783,15 @@ class DoubanDoulist(_PluginBase):
 
                     # 执行媒体库匹配，拿到规范的 TMDB 基础数据对象
                     if settings.RECOGNIZE_SOURCE == "themoviedb":
-                        tmdbinfo = mediachain.get_tmdbinfo_by_doubanid(doubanid=douban_id, mtype=meta.type)
-                        if not tmdbinfo:
+                        cached, tmdbid = subject_cache.get("tmdb", douban_id)
+                        if not cached:
+                            tmdbinfo = mediachain.get_tmdbinfo_by_doubanid(doubanid=douban_id, mtype=meta.type)
+                            tmdbid = tmdbinfo.get("id") if tmdbinfo else None
+                            subject_cache.set("tmdb", douban_id, tmdbid)
+                        if not tmdbid:
                             logger.warn(f"无法通过豆瓣ID {douban_id} 转换得到 TMDB 信息")
                             continue
-                        mediainfo = self.chain.recognize_media(meta=meta, tmdbid=tmdbinfo.get("id"))
+                        mediainfo = self.chain.recognize_media(meta=meta, tmdbid=tmdbid)
                     else:
                         mediainfo = self.chain.recognize_media(meta=meta, doubanid=douban_id)
 
@@ -457,7 +814,7 @@ class DoubanDoulist(_PluginBase):
                             
                             if current_rating < float(self._min_rating):
                                 logger.info(f"影片 {mediainfo.title_year} TMDB 评分 {current_rating} 低于设定最低线 {self._min_rating}，执行过滤拦截")
-                                history.append({
+                                self._append_history(history, history_index, {
                                     "action": f"被过滤 (TMDB评分 {current_rating} < {self._min_rating})",
                                     "title": mediainfo.title,
                                     "type": mediainfo.type.value,
@@ -509,7 +866,7 @@ class DoubanDoulist(_PluginBase):
                             SubscribeChain().add(title=mediainfo.title, year=mediainfo.year, mtype=mediainfo.type, tmdbid=mediainfo.tmdb_id, exist_ok=True, username=username, save_path=custom_path)
                             action = "已添加订阅"
 
-                    history.append({
+                    self._append_history(history, history_index, {
                         "action": f"{action} -> {custom_path}" if custom_path else action,
                         "title": mediainfo.title,
                         "type": mediainfo.type.value,
@@ -525,8 +882,14 @@ class DoubanDoulist(_PluginBase):
                     logger.error(f"同步片单单条数据记录异常 ({raw_title}): {str(item_err)}")
 
         self.save_data('history', history)
+        self.save_data('history_index', history_index)
+        self.save_data('douban_cache', subject_cache.to_dict())
+        # 只保留仍在配置中的片单的抓取状态
+        self.save_data('doulist_state', {doulist_id: state for doulist_id, state in doulist_states.items()
+                                         if doulist_id in {config[0] for config in doulist_configs}})
         self._clearflag = False
-        logger.info(f"本次豆瓣片单同步执行完毕，共处理了 {processed_new_count} 个新影片。")
+        self._full_crawl_flag = False
+        logger.info(f"本次豆瓣片单同步执行完毕，共处理了 {processed_new_count} 个新影片，豆瓣详情缓存命中 {subject_cache.hits} 次。")
 
     @eventmanager.register(EventType.PluginAction)
     def remote_sync(self, event: Event):
@@ -1,12 +1,22 @@
+import bisect
 import datetime
+import hashlib
+import io
+import json
 import re
-import xml.dom.minidom
-from threading import Event
-from typing import Optional, Tuple, List, Dict, Any, TypedDict
+import sqlite3
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from threading import Event, Lock, RLock, Semaphore, Thread
+from typing import Optional, Tuple, List, Dict, Any, TypedDict, Iterator
+from xml.etree import ElementTree
+from urllib.parse import urlencode, urlparse
 import time
-import random
 import pytz
 import requests
+from requests.adapters import HTTPAdapter
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from enum import Enum
@@ -18,14 +28,31 @@ from app.core.meta.metabase import MetaBase
 from app.chain.download import DownloadChain
 from app.chain.media import MediaChain
 from app.chain.subscribe import SubscribeChain
+from app.db.subscribe_oper import SubscribeOper
 from app.core.config import settings
 from app.core.metainfo import MetaInfo
 from app.log import logger
 from app.plugins import _PluginBase
-from app.utils.dom import DomUtils
 from app.utils.http import RequestUtils
 from app.modules.douban.apiv2 import DoubanApi
 
+# 从豆瓣链接中提取豆瓣ID
+DOUBAN_ID_PATTERN = re.compile(r"/(\d+)/")
+# 描述中 '评价数' 到第一个 '<br>' 之间的字符串
+DESCRIPTION_VOTES_PATTERN = re.compile(r"评价数.*?<br>")
+# 描述中的 <img> 标签
+DESCRIPTION_IMG_PATTERN = re.compile(r"<img.*?>")
+# 4位独立数字1900-2099年
+YEAR_PATTERN = re.compile(r"\b(19\d{2}|20\d{2})\b")
+
+# 安装了 brotli 时 urllib3 可自动解压 br 编码的响应
+try:
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
 
 class Status(Enum):
     UNRECOGNIZED = "未识别"
@@ -75,6 +102,1096 @@ class RssInfo(TypedDict):
     year: str | None
 
 
+class RankItem(TypedDict):
+    title: str
+    year: str | None
+    doubanid: str | None
+    mtype: MediaType | None
+    unique: str
+
+
+class RetryPayload(TypedDict):
+    unique: str
+    title: str
+    year: str | None
+    doubanid: str | None
+    mtype: str | None
+    customize_save_paths: Optional[Dict[str, str]]
+    subscription_type: Optional[str]
+    attempts: int
+    next_time: float
+
+
+class PreparedRankItem(TypedDict):
+    item: RankItem
+    meta: MetaBase
+    mediainfo: MediaInfo | None
+    skip: bool
+    filter_status: Optional[Status]
+    is_exist_all: bool
+    missing_season: list[int] | None
+
+
+class FeedCache(TypedDict):
+    etag: str | None
+    last_modified: str | None
+    hash: str
+    items_hash: str
+    filter: str
+    time: str
+
+
+class FeedSpec(TypedDict):
+    id: str
+    url: str
+    save_paths: Optional[Dict[str, str]]
+    subscription_type: Optional[str]
+    filter: str
+
+
+class FeedSnapshot(TypedDict):
+    url: str
+    ids: List[str]
+    filter: str
+    total: int
+    entered: int
+    left: int
+    time: str
+
+
+class SharedFeed(TypedDict):
+    etag: str | None
+    last_modified: str | None
+    hash: str
+    content: bytes
+    rss_infos: Optional[List[RssInfo]]
+    time: float
+
+
+class StageMetrics(TypedDict):
+    count: int
+    seconds: float
+
+
+class FeedMetrics(TypedDict):
+    url: str
+    status: str
+    total: int
+    processed: int
+    seconds: float
+
+
+class RunSummary(TypedDict):
+    time: str
+    duration: float
+    completed: bool
+    items: int
+    items_per_second: float
+    stages: Dict[str, StageMetrics]
+    feeds: Dict[str, FeedMetrics]
+    cache_hits: int
+    cache_misses: int
+    cache_hit_rate: float
+    retries: int
+    prefiltered: int
+    saved_calls: Dict[str, int]
+    throttled: Dict[str, float]
+
+
+class CompactResult(TypedDict):
+    archived: int
+    expired: int
+    duplicated: int
+    overflow: int
+
+
+class MigrateHistoryPage(TypedDict):
+    items: List[HistoryPayload]
+    next: int | None
+
+
+class MigrateCheckpoint(TypedDict):
+    source: str
+    after: int
+    count: int
+
+
+class RssFetchResult(TypedDict):
+    rss_infos: List[RssInfo]
+    cache: FeedCache | None
+    not_modified: bool
+
+
+class RateLimiter:
+    """
+    令牌桶限流器，按固定间隔补充令牌，最多积攒 burst 个令牌
+    """
+
+    def __init__(self, interval: float, burst: int = 1):
+        self._interval = max(0.0, interval)
+        self._burst = max(1, burst)
+        self._lock = RLock()
+        self._tokens = float(self._burst)
+        self._last_time = time.monotonic()
+
+    def acquire(self, event: Event | None = None) -> float:
+        """
+        获取一个令牌，必要时等待，返回等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._interval > 0:
+                self._tokens = min(
+                    float(self._burst),
+                    self._tokens + (now - self._last_time) / self._interval,
+                )
+            else:
+                self._tokens = float(self._burst)
+            self._last_time = now
+
+            # 令牌不足时预占令牌，按顺序排队等待
+            wait = 0.0
+            if self._tokens < 1:
+                wait = (1 - self._tokens) * self._interval
+            self._tokens -= 1
+
+        if wait > 0:
+            if event:
+                event.wait(wait)
+            else:
+                time.sleep(wait)
+        return wait
+
+
+class HttpClient:
+    """
+    插件共用的HTTP连接池，按是否使用代理区分会话，保持长连接复用TCP和TLS连接
+    """
+
+    def __init__(self, pool_maxsize: int = 4, pool_connections: int = 10):
+        self._pool_maxsize = pool_maxsize
+        self._pool_connections = pool_connections
+        self._lock = Lock()
+        self._sessions: Dict[bool, requests.Session] = {}
+
+    def session(self, proxy: bool = False) -> requests.Session:
+        """
+        获取会话，每个主机最多保持 pool_maxsize 个连接
+        """
+        with self._lock:
+            session = self._sessions.get(proxy)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self._pool_connections,
+                    pool_maxsize=self._pool_maxsize,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+                self._sessions[proxy] = session
+            return session
+
+    def get(
+        self,
+        url: str,
+        proxy: bool = False,
+        headers: Dict[str, str] | None = None,
+        timeout: int = 60,
+    ) -> requests.Response | None:
+        """
+        GET请求，proxy 为真时使用系统代理
+        """
+        return RequestUtils(
+            session=self.session(proxy),
+            proxies=(settings.PROXY or {}) if proxy else None,
+            headers=headers,
+            timeout=timeout,
+        ).get_res(url)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class RecognizeCacheEntry(TypedDict):
+    tmdbid: int | None
+    mtype: str | None
+    year: str | None
+    vote: float | None
+    expire: float
+
+
+class RecognizeCache:
+    """
+    媒体识别缓存，按标准化标题、年份和类型缓存识别结果，未识别的结果同样缓存
+    """
+
+    # 识别成功结果的缓存时间（秒）
+    _ttl: int = 7 * 24 * 3600
+    # 未识别结果的缓存时间（秒）
+    _negative_ttl: int = 24 * 3600
+
+    def __init__(self, entries: Dict[str, RecognizeCacheEntry] | None = None):
+        self._lock = RLock()
+        self._entries: Dict[str, RecognizeCacheEntry] = {}
+        # 识别到的媒体信息只保存在内存中，重启后按TMDB ID重新识别
+        self._medias: Dict[str, MediaInfo] = {}
+        self.update(entries)
+
+    def update(self, entries: Dict[str, RecognizeCacheEntry] | None):
+        """
+        合并持久化的识别结果，同一键保留过期时间较晚的结果
+        """
+        now = time.time()
+        with self._lock:
+            for key, entry in (entries or {}).items():
+                if not isinstance(entry, dict) or entry.get("expire", 0) <= now:
+                    continue
+                current = self._entries.get(key)
+                if not current or current.get("expire", 0) < entry["expire"]:
+                    self._entries[key] = entry
+
+    @staticmethod
+    def get_key(
+        title: str, year: str | None, mtype: MediaType | None
+    ) -> str:
+        """
+        获取缓存键，标题去除空白和标点并转为小写
+        """
+        normalized_title = re.sub(r"[\W_]+", "", title or "").lower()
+        return f"{normalized_title}|{year or ''}|{mtype.value if mtype else ''}"
+
+    def get(self, key: str) -> RecognizeCacheEntry | None:
+        """
+        获取缓存的识别结果，同时清理已过期的结果
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.get("expire", 0) <= time.time():
+                self._entries.pop(key, None)
+                self._medias.pop(key, None)
+                entry = None
+            return entry
+
+    def peek(self, key: str) -> RecognizeCacheEntry | None:
+        """
+        获取未过期的识别结果，不清理已过期的结果
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.get("expire", 0) > time.time():
+                return entry
+            return None
+
+    def get_media(self, key: str) -> MediaInfo | None:
+        """
+        获取内存中缓存的媒体信息
+        """
+        with self._lock:
+            return self._medias.get(key)
+
+    def set(self, key: str, mediainfo: MediaInfo | None):
+        """
+        缓存识别结果，mediainfo 为空时缓存为未识别
+        """
+        with self._lock:
+            if mediainfo:
+                self._entries[key] = {
+                    "tmdbid": mediainfo.tmdb_id,
+                    "mtype": mediainfo.type.value if mediainfo.type else None,
+                    "year": mediainfo.year,
+                    "vote": mediainfo.vote_average,
+                    "expire": time.time() + self._ttl,
+                }
+                self._medias[key] = mediainfo
+            else:
+                self._entries[key] = {
+                    "tmdbid": None,
+                    "mtype": None,
+                    "year": None,
+                    "vote": None,
+                    "expire": time.time() + self._negative_ttl,
+                }
+                self._medias.pop(key, None)
+
+    def discard_negative(self, key: str):
+        """
+        清理单个未识别的缓存
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not entry.get("tmdbid"):
+                self._entries.pop(key, None)
+
+    def clear_negative(self) -> int:
+        """
+        清理未识别的缓存，返回清理数量
+        """
+        with self._lock:
+            keys = [k for k, v in self._entries.items() if not v.get("tmdbid")]
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def to_dict(self) -> Dict[str, RecognizeCacheEntry]:
+        with self._lock:
+            return dict(self._entries)
+
+
+class RunMetrics:
+    """
+    单次运行的分阶段、分榜单计数和耗时统计，识别缓存和限流器在模块内共享，
+    命中次数和限流等待时间按运行单独统计
+    """
+
+    # 统计的阶段及显示名称
+    stage_names = {
+        "fetch": "RSS获取",
+        "parse": "RSS解析",
+        "recognize": "媒体识别",
+        "no_exists": "媒体库检查",
+        "subscribe": "订阅",
+    }
+
+    def __init__(self):
+        self._lock = Lock()
+        self._start = time.perf_counter()
+        self.stages: Dict[str, StageMetrics] = {}
+        self.feeds: Dict[str, FeedMetrics] = {}
+        self.retries = 0
+        # 识别前过滤的条目数量，及因此省去的各阶段调用次数
+        self.prefiltered = 0
+        self.saved_calls: Dict[str, int] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # 各上游的限流等待时间（秒）
+        self.throttled: Dict[str, float] = {}
+        self.completed = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        统计一次阶段调用的耗时
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                stage = self.stages.setdefault(name, {"count": 0, "seconds": 0.0})
+                stage["count"] += 1
+                stage["seconds"] += seconds
+
+    def set_feed(
+        self,
+        spec: FeedSpec,
+        status: str,
+        total: int,
+        processed: int,
+        seconds: float,
+    ):
+        with self._lock:
+            self.feeds[spec["id"]] = {
+                "url": spec["url"],
+                "status": status,
+                "total": total,
+                "processed": processed,
+                "seconds": round(seconds, 3),
+            }
+
+    def add_retry(self, count: int = 1):
+        with self._lock:
+            self.retries += count
+
+    def add_cache_lookup(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def add_throttled(self, upstream: str, seconds: float):
+        with self._lock:
+            self.throttled[upstream] = self.throttled.get(upstream, 0.0) + seconds
+
+    def add_saved_calls(self, names: List[str], prefiltered: bool = False):
+        with self._lock:
+            if prefiltered:
+                self.prefiltered += 1
+            for name in names:
+                self.saved_calls[name] = self.saved_calls.get(name, 0) + 1
+
+    def to_summary(self) -> RunSummary:
+        duration = time.perf_counter() - self._start
+        with self._lock:
+            items = sum(feed["processed"] for feed in self.feeds.values())
+            hits, misses = self.cache_hits, self.cache_misses
+            return {
+                "time": datetime.datetime.now(
+                    tz=pytz.timezone(settings.TZ)
+                ).strftime("%Y-%m-%d %H:%M:%S"),
+                "duration": round(duration, 3),
+                "completed": self.completed,
+                "items": items,
+                "items_per_second": round(items / duration, 2)
+                if duration
+                else 0.0,
+                "stages": {
+                    name: {
+                        "count": stage["count"],
+                        "seconds": round(stage["seconds"], 3),
+                    }
+                    for name, stage in self.stages.items()
+                },
+                "feeds": dict(self.feeds),
+                "cache_hits": hits,
+                "cache_misses": misses,
+                "cache_hit_rate": round(hits / (hits + misses), 3)
+                if hits + misses
+                else 0.0,
+                "retries": self.retries,
+                "prefiltered": self.prefiltered,
+                "saved_calls": dict(self.saved_calls),
+                "throttled": {
+                    upstream: round(seconds, 3)
+                    for upstream, seconds in self.throttled.items()
+                },
+            }
+
+
+class SharedFeedCache:
+    """
+    模块内共享的RSS内容缓存，有效期内获取同一地址时只请求一次，插件重新初始化后仍保留
+    """
+
+    # RSS内容的共享时间（秒）
+    _ttl: int = 600
+
+    def __init__(self):
+        self._lock = Lock()
+        self._addr_locks: Dict[str, Lock] = {}
+        self._feeds: Dict[str, SharedFeed] = {}
+
+    def lock(self, addr: str) -> Lock:
+        """
+        获取地址锁，同一地址同时只有一个请求
+        """
+        with self._lock:
+            return self._addr_locks.setdefault(addr, Lock())
+
+    def get(self, addr: str) -> SharedFeed | None:
+        with self._lock:
+            feed = self._feeds.get(addr)
+            if feed and time.time() - feed["time"] > self._ttl:
+                self._feeds.pop(addr, None)
+                feed = None
+            return feed
+
+    def set(self, addr: str, feed: SharedFeed):
+        with self._lock:
+            now = time.time()
+            # 顺带清理过期内容
+            for key in [
+                k for k, v in self._feeds.items() if now - v["time"] > self._ttl
+            ]:
+                self._feeds.pop(key, None)
+            self._feeds[addr] = feed
+
+
+# 模块内共享的RSS内容、识别缓存和上游限流器，插件重新初始化后仍保留
+_shared_feed_cache = SharedFeedCache()
+_shared_recognize_cache = RecognizeCache()
+_shared_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+class HistoryStore:
+    """
+    基于SQLite的历史记录存储，以 unique 为主键，按状态和时间建立索引。
+    另外维护 unique 的64位指纹有序数组作为去重索引，持久化在数据库旁，
+    判断是否处理过时不查询数据库。压缩清理的记录只保留指纹，仍参与去重
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS history (
+            "unique" TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            time_full TEXT NOT NULL,
+            tmdbid TEXT,
+            doubanid TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_history_status ON history (status);
+        CREATE INDEX IF NOT EXISTS idx_history_time_full
+            ON history (time_full);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS pruned (
+            fingerprint INTEGER PRIMARY KEY,
+            status TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS retry (
+            "unique" TEXT PRIMARY KEY,
+            next_time REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_retry_next_time ON retry (next_time);
+    """
+    # 归档库只保存历史记录
+    _archive_schema = """
+        CREATE TABLE IF NOT EXISTS history (
+            "unique" TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            time_full TEXT NOT NULL,
+            tmdbid TEXT,
+            doubanid TEXT,
+            data TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: Path):
+        self._db_path = db_path
+        self._lock = RLock()
+        self._conn: sqlite3.Connection | None = None
+        # 各状态的记录数量，首次统计时加载，之后随写入和删除增量维护
+        self._counts: Dict[str, int] | None = None
+        # 去重索引，索引文件记录生成时的数据版本，与数据库不一致时重建
+        self._index_path = db_path.with_suffix(".idx")
+        self._archive_path = db_path.with_name(f"{db_path.stem}_archive.db")
+        self._fingerprints: array | None = None
+        self._generation: int | None = None
+        self._index_dirty = False
+
+    def __get_conn(self) -> sqlite3.Connection:
+        """
+        获取数据库连接，关闭后再次使用时自动重连
+        """
+        if self._conn is None:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self._schema)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """
+        保存去重索引并关闭数据库连接
+        """
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._counts = None
+            self._fingerprints = None
+            self._generation = None
+
+    @staticmethod
+    def __get_fingerprint(unique: str) -> int:
+        return int.from_bytes(
+            hashlib.blake2b(unique.encode(), digest_size=8).digest(),
+            "little",
+            signed=True,
+        )
+
+    def __get_generation(self) -> int:
+        """
+        数据版本，每次写入递增
+        """
+        if self._generation is None:
+            row = (
+                self.__get_conn()
+                .execute("SELECT value FROM meta WHERE key = 'generation'")
+                .fetchone()
+            )
+            self._generation = row[0] if row else 0
+        return self._generation
+
+    def __bump_generation(self, conn: sqlite3.Connection):
+        """
+        在写入事务中递增数据版本
+        """
+        self._generation = self.__get_generation() + 1
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)",
+            (self._generation,),
+        )
+        self._index_dirty = True
+
+    def __get_fingerprints(self) -> array:
+        """
+        获取去重索引，优先读取索引文件，版本不一致时从数据库重建
+        """
+        if self._fingerprints is not None:
+            return self._fingerprints
+        generation = self.__get_generation()
+        fingerprints = array("q")
+        try:
+            content = self._index_path.read_bytes()
+            header = array("q", content[:8])
+            if header and header[0] == generation:
+                fingerprints.frombytes(content[8:])
+                self._fingerprints = fingerprints
+                return fingerprints
+        except (OSError, ValueError):
+            pass
+        conn = self.__get_conn()
+        fingerprints = array(
+            "q",
+            sorted(
+                {
+                    HistoryStore.__get_fingerprint(row[0])
+                    for row in conn.execute('SELECT "unique" FROM history')
+                }
+                | {row[0] for row in conn.execute("SELECT fingerprint FROM pruned")}
+            ),
+        )
+        self._fingerprints = fingerprints
+        self._index_dirty = True
+        return fingerprints
+
+    def __add_fingerprint(self, unique: str):
+        if self._fingerprints is None:
+            return
+        fingerprint = HistoryStore.__get_fingerprint(unique)
+        index = bisect.bisect_left(self._fingerprints, fingerprint)
+        if (
+            index == len(self._fingerprints)
+            or self._fingerprints[index] != fingerprint
+        ):
+            self._fingerprints.insert(index, fingerprint)
+
+    def __remove_fingerprint(self, unique: str):
+        if self._fingerprints is None:
+            return
+        fingerprint = HistoryStore.__get_fingerprint(unique)
+        index = bisect.bisect_left(self._fingerprints, fingerprint)
+        if (
+            index < len(self._fingerprints)
+            and self._fingerprints[index] == fingerprint
+        ):
+            del self._fingerprints[index]
+
+    def flush(self):
+        """
+        保存去重索引
+        """
+        with self._lock:
+            if not self._index_dirty or self._fingerprints is None:
+                return
+            tmp_path = self._index_path.with_suffix(".idx.tmp")
+            with open(tmp_path, "wb") as f:
+                array("q", [self.__get_generation()]).tofile(f)
+                self._fingerprints.tofile(f)
+            tmp_path.replace(self._index_path)
+            self._index_dirty = False
+
+    @staticmethod
+    def __get_row(history: HistoryPayload) -> Tuple[str, ...]:
+        return (
+            history.get("unique"),
+            history.get("status") or Status.UNRECOGNIZED.value,
+            history.get("time_full") or "",
+            str(history.get("tmdbid") or "0"),
+            str(history.get("doubanid") or "0"),
+            json.dumps(history, ensure_ascii=False),
+        )
+
+    @staticmethod
+    def __get_where(
+        status: str | None = None, exclude_status: str | None = None
+    ) -> Tuple[str, List[str]]:
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if exclude_status:
+            conditions.append("status != ?")
+            params.append(exclude_status)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def __get_counts(self) -> Dict[str, int]:
+        """
+        获取各状态的记录数量
+        """
+        if self._counts is None:
+            rows = (
+                self.__get_conn()
+                .execute("SELECT status, COUNT(*) FROM history GROUP BY status")
+                .fetchall()
+            )
+            self._counts = {status: count for status, count in rows}
+        return self._counts
+
+    def __change_count(self, status: str, delta: int):
+        if self._counts is None:
+            return
+        count = self._counts.get(status, 0) + delta
+        if count > 0:
+            self._counts[status] = count
+        else:
+            self._counts.pop(status, None)
+
+    def __get_statuses(self, uniques: List[str]) -> Dict[str, str]:
+        """
+        查询已存在记录的状态
+        """
+        statuses: Dict[str, str] = {}
+        conn = self.__get_conn()
+        for i in range(0, len(uniques), 500):
+            chunk = uniques[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            statuses.update(
+                conn.execute(
+                    'SELECT "unique", status FROM history '
+                    f'WHERE "unique" IN ({placeholders})',
+                    chunk,
+                ).fetchall()
+            )
+        return statuses
+
+    def exists(self, unique: str) -> bool:
+        """
+        判断历史记录是否存在，只查询去重索引，64位指纹冲突的概率可忽略
+        """
+        fingerprint = HistoryStore.__get_fingerprint(unique)
+        with self._lock:
+            fingerprints = self.__get_fingerprints()
+            index = bisect.bisect_left(fingerprints, fingerprint)
+            return (
+                index < len(fingerprints) and fingerprints[index] == fingerprint
+            )
+
+    def add(self, history: HistoryPayload):
+        """
+        添加历史记录，unique 相同时覆盖
+        """
+        self.add_many([history])
+
+    def add_many(self, historys: List[HistoryPayload]) -> int:
+        """
+        批量添加历史记录，返回写入数量
+        """
+        rows = [
+            HistoryStore.__get_row(h) for h in historys if h and h.get("unique")
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self.__get_conn()
+            # 覆盖已有记录时需要扣减原状态的数量
+            old_statuses = (
+                self.__get_statuses([row[0] for row in rows])
+                if self._counts is not None
+                else {}
+            )
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO history "
+                    '("unique", status, time_full, tmdbid, doubanid, data) '
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self.__bump_generation(conn)
+            for row in rows:
+                self.__add_fingerprint(row[0])
+                old_status = old_statuses.pop(row[0], None)
+                if old_status:
+                    self.__change_count(old_status, -1)
+                self.__change_count(row[1], 1)
+        return len(rows)
+
+    def delete(self, unique: str) -> bool:
+        """
+        删除历史记录
+        """
+        with self._lock:
+            conn = self.__get_conn()
+            old_status = self.__get_statuses([unique]).get(unique)
+            if not old_status:
+                return False
+            with conn:
+                conn.execute('DELETE FROM history WHERE "unique" = ?', (unique,))
+                conn.execute('DELETE FROM retry WHERE "unique" = ?', (unique,))
+                conn.execute(
+                    "DELETE FROM pruned WHERE fingerprint = ?",
+                    (HistoryStore.__get_fingerprint(unique),),
+                )
+                self.__bump_generation(conn)
+            self.__change_count(old_status, -1)
+            self.__remove_fingerprint(unique)
+        return True
+
+    def delete_by_status(self, status: str) -> int:
+        """
+        删除指定状态的历史记录，返回删除数量
+        """
+        with self._lock:
+            conn = self.__get_conn()
+            removed = (
+                {
+                    HistoryStore.__get_fingerprint(row[0])
+                    for row in conn.execute(
+                        'SELECT "unique" FROM history WHERE status = ?',
+                        (status,),
+                    )
+                }
+                | {
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT fingerprint FROM pruned WHERE status = ?",
+                        (status,),
+                    )
+                }
+                if self._fingerprints is not None
+                else set()
+            )
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM history WHERE status = ?", (status,)
+                )
+                conn.execute("DELETE FROM pruned WHERE status = ?", (status,))
+                if status == Status.UNRECOGNIZED.value:
+                    conn.execute("DELETE FROM retry")
+                self.__bump_generation(conn)
+            if self._counts is not None:
+                self._counts.pop(status, None)
+            if removed and self._fingerprints is not None:
+                self._fingerprints = array(
+                    "q", (f for f in self._fingerprints if f not in removed)
+                )
+        return cursor.rowcount
+
+    def clear(self):
+        """
+        清空历史记录
+        """
+        with self._lock:
+            conn = self.__get_conn()
+            with conn:
+                conn.execute("DELETE FROM history")
+                conn.execute("DELETE FROM pruned")
+                conn.execute("DELETE FROM retry")
+                self.__bump_generation(conn)
+            self._counts = {}
+            self._fingerprints = array("q")
+
+    def count(
+        self, status: str | None = None, exclude_status: str | None = None
+    ) -> int:
+        """
+        统计历史记录数量
+        """
+        with self._lock:
+            counts = self.__get_counts()
+            return sum(
+                count
+                for _status, count in counts.items()
+                if (not status or _status == status)
+                and (not exclude_status or _status != exclude_status)
+            )
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        status: str | None = None,
+        exclude_status: str | None = None,
+    ) -> List[HistoryPayload]:
+        """
+        按时间降序分页查询历史记录
+        """
+        where, params = HistoryStore.__get_where(status, exclude_status)
+        sql = (
+            f"SELECT data FROM history{where} "
+            "ORDER BY time_full DESC, rowid DESC LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = (
+                self.__get_conn()
+                .execute(
+                    sql, [*params, -1 if limit is None else limit, offset]
+                )
+                .fetchall()
+            )
+        return [json.loads(row[0]) for row in rows]
+
+    def query_after(
+        self, after: int = 0, limit: int = 500
+    ) -> Tuple[List[HistoryPayload], int | None]:
+        """
+        按写入顺序分页导出历史记录，返回本页记录和下一页的游标，没有下一页时游标为空。
+        覆盖写入的记录会移到末尾，导出过程中有写入也不会遗漏
+        """
+        with self._lock:
+            rows = (
+                self.__get_conn()
+                .execute(
+                    "SELECT rowid, data FROM history WHERE rowid > ? "
+                    "ORDER BY rowid LIMIT ?",
+                    (after, limit),
+                )
+                .fetchall()
+            )
+        next_after = rows[-1][0] if len(rows) == limit else None
+        return [json.loads(row[1]) for row in rows], next_after
+
+    def add_retry(self, payload: RetryPayload):
+        """
+        加入或更新未识别重试队列
+        """
+        with self._lock:
+            conn = self.__get_conn()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO retry ("unique", next_time, data) '
+                    "VALUES (?, ?, ?)",
+                    (
+                        payload["unique"],
+                        payload["next_time"],
+                        json.dumps(payload, ensure_ascii=False),
+                    ),
+                )
+
+    def delete_retry(self, unique: str):
+        """
+        移出未识别重试队列
+        """
+        with self._lock:
+            conn = self.__get_conn()
+            with conn:
+                conn.execute('DELETE FROM retry WHERE "unique" = ?', (unique,))
+
+    def get_due_retries(self, now: float, limit: int) -> List[RetryPayload]:
+        """
+        获取到期的重试条目，按到期时间升序
+        """
+        with self._lock:
+            rows = (
+                self.__get_conn()
+                .execute(
+                    "SELECT data FROM retry WHERE next_time <= ? "
+                    "ORDER BY next_time LIMIT ?",
+                    (now, limit),
+                )
+                .fetchall()
+            )
+        return [json.loads(row[0]) for row in rows]
+
+    def count_retries(self) -> int:
+        with self._lock:
+            row = (
+                self.__get_conn()
+                .execute("SELECT COUNT(*) FROM retry")
+                .fetchone()
+            )
+        return row[0] if row else 0
+
+    def compact(
+        self,
+        expire_before: str | None = None,
+        max_count: int = 0,
+        latest_per_tmdbid: bool = False,
+        archive_unrecognized_before: str | None = None,
+    ) -> CompactResult:
+        """
+        按保留策略压缩历史记录，清理的记录只保留指纹用于去重
+        :param expire_before: 删除 time_full 早于该时间的记录
+        :param max_count: 只保留最新的若干条记录，0为不限制
+        :param latest_per_tmdbid: 同一TMDB ID只保留最新的一条记录
+        :param archive_unrecognized_before: 早于该时间的未识别记录移到归档库
+        """
+        result: CompactResult = {
+            "archived": 0,
+            "expired": 0,
+            "duplicated": 0,
+            "overflow": 0,
+        }
+        unrecognized = Status.UNRECOGNIZED.value
+        if archive_unrecognized_before:
+            result["archived"] = self.__prune(
+                "WHERE status = ? AND time_full < ?",
+                [unrecognized, archive_unrecognized_before],
+                archive=True,
+            )
+        if expire_before:
+            result["expired"] = self.__prune(
+                "WHERE time_full < ?", [expire_before]
+            )
+        if latest_per_tmdbid:
+            result["duplicated"] = self.__prune(
+                "WHERE tmdbid != '0' AND rowid NOT IN ("
+                "SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+                "PARTITION BY tmdbid ORDER BY time_full DESC, rowid DESC"
+                ") AS n FROM history WHERE tmdbid != '0') WHERE n = 1)",
+                [],
+            )
+        if max_count > 0:
+            result["overflow"] = self.__prune(
+                "WHERE rowid NOT IN (SELECT rowid FROM history "
+                "ORDER BY time_full DESC, rowid DESC LIMIT ?)",
+                [max_count],
+            )
+        return result
+
+    def __prune(self, where: str, params: List[Any], archive: bool = False) -> int:
+        """
+        删除符合条件的记录并保留指纹，archive 为真时先写入归档库
+        """
+        with self._lock:
+            conn = self.__get_conn()
+            rows = conn.execute(
+                'SELECT "unique", status, time_full, tmdbid, doubanid, data '
+                f"FROM history {where}",
+                params,
+            ).fetchall()
+            if not rows:
+                return 0
+            if archive:
+                self._archive_path.parent.mkdir(parents=True, exist_ok=True)
+                archive_conn = sqlite3.connect(str(self._archive_path))
+                try:
+                    archive_conn.executescript(self._archive_schema)
+                    with archive_conn:
+                        archive_conn.executemany(
+                            "INSERT OR REPLACE INTO history "
+                            '("unique", status, time_full, tmdbid, doubanid, data) '
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            rows,
+                        )
+                finally:
+                    archive_conn.close()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO pruned (fingerprint, status) "
+                    "VALUES (?, ?)",
+                    [
+                        (HistoryStore.__get_fingerprint(row[0]), row[1])
+                        for row in rows
+                    ],
+                )
+                conn.executemany(
+                    'DELETE FROM history WHERE "unique" = ?',
+                    [(row[0],) for row in rows],
+                )
+                # 清理的记录不再重试
+                conn.executemany(
+                    'DELETE FROM retry WHERE "unique" = ?',
+                    [(row[0],) for row in rows],
+                )
+                self.__bump_generation(conn)
+            # 指纹仍在去重索引中，只需重新统计数量
+            self._counts = None
+            return len(rows)
+
+
 class DoubanRankPlus2(_PluginBase):
     # 插件名称
     plugin_name = "豆瓣榜单Plus（自用）"
@@ -83,7 +1200,7 @@ class DoubanRankPlus2(_PluginBase):
     # 插件图标
     plugin_icon = ""
     # 插件版本
-    plugin_version = "1.0.0"
+    plugin_version = "1.1.0"
     # 插件作者
     plugin_author = "yuwancumian"
     # 作者主页
@@ -102,11 +1219,29 @@ class DoubanRankPlus2(_PluginBase):
     subscribechain: SubscribeChain
     mediachain: MediaChain
     doubanapi: DoubanApi
+    subscribeoper: SubscribeOper
 
     # 私有属性
     _plugin_id = "DoubanRankPlus2"
     _msg_install = "如果MP是V1版本需要**重启一次**让API生效，V2版本无需重启"
     _msg_migrate_install = "请确保原MP已**安装并启用**此插件"
+    # 从原MP迁移的配置项
+    _migrate_config_keys = (
+        "enabled",
+        "cron",
+        "onlyonce",
+        "vote",
+        "ranks",
+        "rss_addrs",
+        "clear",
+        "clear_unrecognized",
+        "is_seasons_all",
+        "is_only_movies",
+        "release_year",
+        "history_type",
+    )
+    # 已移除的配置项，加载时从保存的配置中清理
+    _removed_config_keys = ("sleep_time", "is_exit_ip_rate_limit")
 
     _scheduler = None
     _douban_address = {
@@ -119,12 +1254,25 @@ class DoubanRankPlus2(_PluginBase):
         "movie-top250": "https://rsshub.app/douban/movie/weekly/movie_top250",
         "movie-top250-full": "https://rsshub.app/douban/list/movie_top250",
     }
+    # 并发获取RSS的最大线程数
+    _rss_fetch_workers: int = 8
+    # 同一主机并发获取RSS的最大数量
+    _rss_fetch_per_host: int = 4
+    # 上游请求的最小间隔（秒）和突发数量，限流器在模块内共享，只在首次初始化时创建，
+    # 因此不提供配置项。每次运行只请求少量RSS地址，TMDB间隔低于其公开的每秒约40次的限制
+    _rss_interval: float = 0.5
+    _tmdb_interval: float = 0.1
+    _tmdb_burst: int = 10
 
     _enabled: bool = False
     _cron: str = ""
     _onlyonce: bool = False
     _rss_addrs: List[str] = []
     _ranks: List[str] = []
+    # 编译后的榜单地址配置，及配置中的错误和警告
+    _feed_specs: List[FeedSpec] = []
+    _feed_spec_errors: List[str] = []
+    _feed_spec_warnings: List[str] = []
     _vote: float = 0.0
     _clear: bool = False
     _clearflag: bool = False
@@ -133,89 +1281,72 @@ class DoubanRankPlus2(_PluginBase):
     _proxy: bool = False
     _is_seasons_all: bool = True
     _release_year: int = 0
-    _min_sleep_time: int = 3
-    _max_sleep_time: int = 10
     _history_type: str = HistoryDataType.LATEST.value
-    _is_exit_ip_rate_limit: bool = False
+    # 详情页历史记录每页数量，详情页只渲染第一页，之后的记录通过 /history 接口分页查询
+    _history_page_size: int = 24
     _is_only_movies: bool = False
+    _incremental: bool = False
+    _process_workers: int = 1
+    # 历史保留策略，0为不限制
+    _retention_days: int = 0
+    _retention_count: int = 0
+    _retention_latest_per_tmdbid: bool = False
+    _archive_unrecognized_days: int = 0
+    # 每次运行重试的未识别条目数量，重试间隔按次数指数增长
+    _retry_budget: int = 20
+    _retry_interval: int = 6 * 3600
+    _retry_max_attempts: int = 6
 
     _migrate_from_url = ""
     _migrate_api_token = ""
     _migrate_once = False
+    # 每次获取的迁移历史记录数量
+    _migrate_page_size: int = 500
+
+    # 历史记录存储
+    _history: HistoryStore | None = None
+    # 媒体识别缓存
+    _recognize_cache: RecognizeCache | None = None
+    # 各上游的限流器
+    _rate_limiters: Dict[str, RateLimiter] = {}
+    # 本次运行的统计，及保留的最近运行统计数量
+    _metrics: RunMetrics | None = None
+    _run_metrics_limit: int = 30
+    # 历史压缩线程
+    _compact_thread: Thread | None = None
+    # HTTP连接池
+    _http: HttpClient | None = None
 
     def init_plugin(self, config: dict[str, Any] | None = None):
         self.downloadchain = DownloadChain()
         self.subscribechain = SubscribeChain()
         self.mediachain = MediaChain()
         self.doubanapi = DoubanApi()
+        self.subscribeoper = SubscribeOper()
 
         if config:
-            self._enabled = config.get("enabled", False)
-            self._proxy = config.get("proxy", False)
-            self._onlyonce = config.get("onlyonce", False)
-            self._is_seasons_all = config.get("is_seasons_all", True)
-            self._is_only_movies = config.get("is_only_movies", False)
-
-            self._migrate_from_url = config.get("migrate_from_url", "")
-            self._migrate_api_token = config.get("migrate_api_token", "")
-            self._migrate_once = config.get("migrate_once", False)
-
-            self._cron = (
-                config.get("cron", "").strip()
-                if config.get("cron", "").strip()
-                else ""
-            )
-
-            self._release_year = (
-                int(config.get("release_year", "").strip())
-                if config.get("release_year", "").strip()
-                else 0
-            )
-
-            self._vote = (
-                float(str(config.get("vote", "")).strip())
-                if str(config.get("vote", "")).strip()
-                else 0.0
-            )
+            self.__apply_config(config)
+            if any(key in config for key in self._removed_config_keys):
+                self.__update_config()
 
-            __sleep_time = config.get("sleep_time", "3,10").strip()
-            __sleep_time_list = re.split("[,，]", __sleep_time)
+        # 编译榜单地址配置，配置错误在保存时提示
+        self.__compile_feed_specs()
 
-            self._min_sleep_time, self._max_sleep_time = (
-                3,
-                10,
-            )  # default values
+        # 停止现有任务
+        self.stop_service()
 
-            if len(__sleep_time_list) == 2:
-                __min_sleep_time, __max_sleep_time = map(
-                    int, __sleep_time_list
-                )
-                if __max_sleep_time >= __min_sleep_time:
-                    self._min_sleep_time = __min_sleep_time
-                    self._max_sleep_time = __max_sleep_time
-                else:
-                    logger.warn("最大休眠时间小于最小休眠时间,使用默认值")
-            else:
-                logger.warn("休眠时间配置格式不正确,使用默认值")
+        # HTTP连接池，同一主机的连接数与并发获取RSS的数量一致
+        self._http = HttpClient(pool_maxsize=self._rss_fetch_per_host)
 
-            rss_addrs = config.get("rss_addrs")
-            if rss_addrs and isinstance(rss_addrs, str):
-                self._rss_addrs = rss_addrs.split("\n")
-            else:
-                self._rss_addrs = []
+        # 加载历史记录存储
+        self.__load_history_store()
 
-            self._ranks = config.get("ranks", [])
-            self._clear = config.get("clear", False)
-            self._clear_unrecognized = config.get("clear_unrecognized", False)
-            self._history_type = config.get(
-                "history_type", HistoryDataType.LATEST.value
-            )
-            self._is_exit_ip_rate_limit = config.get(
-                "is_exit_ip_rate_limit", False
-            )
+        # 加载媒体识别缓存
+        self._recognize_cache = _shared_recognize_cache
+        self._recognize_cache.update(self.get_data("recognize_cache"))
 
-        # 停止现有任务
-        self.stop_service()
+        # 初始化限流器
+        self.__init_rate_limiters()
 
         # 启动服务
         if self._enabled or self._onlyonce:
@@ -254,6 +1385,133 @@ class DoubanRankPlus2(_PluginBase):
                 # 保存配置
                 self.__update_config()
 
+    def __apply_config(self, config: dict[str, Any]):
+        """
+        解析插件配置，初始化插件和迁移原MP配置时共用
+        """
+        self._enabled = config.get("enabled", False)
+        self._proxy = config.get("proxy", False)
+        self._onlyonce = config.get("onlyonce", False)
+        self._is_seasons_all = config.get("is_seasons_all", True)
+        self._is_only_movies = config.get("is_only_movies", False)
+        self._incremental = config.get("incremental", False)
+
+        self._migrate_from_url = config.get("migrate_from_url", "")
+        self._migrate_api_token = config.get("migrate_api_token", "")
+        self._migrate_once = config.get("migrate_once", False)
+
+        self._cron = (
+            config.get("cron", "").strip()
+            if config.get("cron", "").strip()
+            else ""
+        )
+
+        self._release_year = (
+            int(config.get("release_year", "").strip())
+            if config.get("release_year", "").strip()
+            else 0
+        )
+
+        self._vote = (
+            float(str(config.get("vote", "")).strip())
+            if str(config.get("vote", "")).strip()
+            else 0.0
+        )
+
+        __process_workers = str(config.get("process_workers", "")).strip()
+        self._process_workers = (
+            max(1, int(__process_workers))
+            if __process_workers.isdigit()
+            else 1
+        )
+
+        self._retention_days = DoubanRankPlus2.__get_int_config(
+            config, "retention_days"
+        )
+        self._retention_count = DoubanRankPlus2.__get_int_config(
+            config, "retention_count"
+        )
+        self._retention_latest_per_tmdbid = config.get(
+            "retention_latest_per_tmdbid", False
+        )
+        self._archive_unrecognized_days = DoubanRankPlus2.__get_int_config(
+            config, "archive_unrecognized_days"
+        )
+        self._retry_budget = DoubanRankPlus2.__get_int_config(
+            config, "retry_budget", DoubanRankPlus2._retry_budget
+        )
+
+        rss_addrs = config.get("rss_addrs")
+        if rss_addrs and isinstance(rss_addrs, str):
+            self._rss_addrs = rss_addrs.split("\n")
+        else:
+            self._rss_addrs = []
+
+        self._ranks = config.get("ranks", [])
+        self._clear = config.get("clear", False)
+        self._clear_unrecognized = config.get("clear_unrecognized", False)
+        self._history_type = config.get(
+            "history_type", HistoryDataType.LATEST.value
+        )
+
+    def __compile_feed_specs(self):
+        """
+        编译自定义RSS地址和内置榜单，配置错误的地址不参与运行，有警告的地址仍参与运行
+        """
+        lines = [
+            (f"第 {index + 1} 行", addr)
+            for index, addr in enumerate(self._rss_addrs)
+            if addr and addr.strip()
+        ] + [
+            (f"榜单 {rank}", self._douban_address.get(rank))
+            for rank in self._ranks
+        ]
+
+        feed_specs: List[FeedSpec] = []
+        errors: List[str] = []
+        warnings: List[str] = []
+        feed_ids = set()
+        for source, line in lines:
+            if not line:
+                errors.append(f"{source}：未知的榜单")
+                continue
+            spec, error, warning = DoubanRankPlus2.__parse_feed_spec(line)
+            if error:
+                errors.append(f"{source}：{error}")
+                continue
+            if warning:
+                warnings.append(f"{source}：{warning}")
+            if spec["id"] in feed_ids:
+                errors.append(f"{source}：{spec['url']} 重复")
+                continue
+            feed_ids.add(spec["id"])
+            spec["filter"] = self.__get_feed_filter_hash(spec)
+            feed_specs.append(spec)
+            logger.debug(
+                f"榜单 {spec['url']} 保存路径: {spec['save_paths']}, "
+                f"订阅类型: {spec['subscription_type']}"
+            )
+
+        for error in errors:
+            logger.error(f"榜单地址配置错误，{error}")
+        for warning in warnings:
+            logger.warn(f"榜单地址配置警告，{warning}")
+        self._feed_specs = feed_specs
+        self._feed_spec_errors = errors
+        self._feed_spec_warnings = warnings
+
+    @staticmethod
+    def __get_int_config(
+        config: dict[str, Any], key: str, default: int = 0
+    ) -> int:
+        """
+        读取非负整数配置，未配置时为默认值，格式不正确时为0
+        """
+        if key not in config:
+            return default
+        value = str(config.get(key) or "").strip()
+        return int(value) if value.isdigit() else 0
+
     def get_state(self) -> bool:
         return self._enabled
 
@@ -278,6 +1536,18 @@ class DoubanRankPlus2(_PluginBase):
                 "methods": ["GET"],
                 "summary": "删除豆瓣榜单Plus历史记录",
             },
+            {
+                "path": "/history",
+                "endpoint": self.get_history,
+                "methods": ["GET"],
+                "summary": "分页查询豆瓣榜单Plus历史记录",
+            },
+            {
+                "path": "/run_metrics",
+                "endpoint": self.get_run_metrics,
+                "methods": ["GET"],
+                "summary": "获取豆瓣榜单Plus最近运行统计",
+            },
             {
                 "path": "/migrate-history",
                 "endpoint": self.get_migrate_history,
@@ -406,8 +1676,8 @@ class DoubanRankPlus2(_PluginBase):
                                         {
                                             "component": "VSwitch",
                                             "props": {
-                                                "model": "is_exit_ip_rate_limit",
-                                                "label": "豆瓣限制时结束",
+                                                "model": "incremental",
+                                                "label": "只处理新上榜条目",
                                             },
                                         }
                                     ],
@@ -464,9 +1734,9 @@ class DoubanRankPlus2(_PluginBase):
                                         {
                                             "component": "VTextField",
                                             "props": {
-                                                "model": "sleep_time",
-                                                "label": "随机休眠时间范围",
-                                                "placeholder": "默认: 3,10。减少豆瓣访问频率。格式：最小秒数,最大秒数。",
+                                                "model": "process_workers",
+                                                "label": "并发处理线程数",
+                                                "placeholder": "默认: 1，顺序处理。大于1时并发识别媒体和检查媒体库",
                                             },
                                         }
                                     ],
@@ -478,7 +1748,7 @@ class DoubanRankPlus2(_PluginBase):
                             "content": [
                                 {
                                     "component": "VCol",
-                                    "props": {"cols": 12, "md": 6},
+                                    "props": {"cols": 12, "md": 4},
                                     "content": [
                                         {
                                             "component": "VTextField",
@@ -492,7 +1762,7 @@ class DoubanRankPlus2(_PluginBase):
                                 },
                                 {
                                     "component": "VCol",
-                                    "props": {"cols": 12, "md": 6},
+                                    "props": {"cols": 12, "md": 4},
                                     "content": [
                                         {
                                             "component": "VTextField",
@@ -504,6 +1774,101 @@ class DoubanRankPlus2(_PluginBase):
                                         }
                                     ],
                                 },
+                                {
+                                    "component": "VCol",
+                                    "props": {"cols": 12, "md": 4},
+                                    "content": [
+                                        {
+                                            "component": "VTextField",
+                                            "props": {
+                                                "model": "retry_budget",
+                                                "label": "未识别重试数量",
+                                                "placeholder": "每次运行重试到期的未识别条目数量，0为不重试",
+                                            },
+                                        }
+                                    ],
+                                },
+                            ],
+                        },
+                        {
+                            "component": "VRow",
+                            "content": [
+                                {
+                                    "component": "VCol",
+                                    "props": {"cols": 12, "md": 3},
+                                    "content": [
+                                        {
+                                            "component": "VTextField",
+                                            "props": {
+                                                "model": "retention_days",
+                                                "label": "历史保留天数",
+                                                "placeholder": "0为不限制",
+                                            },
+                                        }
+                                    ],
+                                },
+                                {
+                                    "component": "VCol",
+                                    "props": {"cols": 12, "md": 3},
+                                    "content": [
+                                        {
+                                            "component": "VTextField",
+                                            "props": {
+                                                "model": "retention_count",
+                                                "label": "历史最大数量",
+                                                "placeholder": "0为不限制",
+                                            },
+                                        }
+                                    ],
+                                },
+                                {
+                                    "component": "VCol",
+                                    "props": {"cols": 12, "md": 3},
+                                    "content": [
+                                        {
+                                            "component": "VTextField",
+                                            "props": {
+                                                "model": "archive_unrecognized_days",
+                                                "label": "未识别归档天数",
+                                                "placeholder": "0为不归档",
+                                            },
+                                        }
+                                    ],
+                                },
+                                {
+                                    "component": "VCol",
+                                    "props": {"cols": 12, "md": 3},
+                                    "content": [
+                                        {
+                                            "component": "VSwitch",
+                                            "props": {
+                                                "model": "retention_latest_per_tmdbid",
+                                                "label": "同一媒体只保留最新",
+                                            },
+                                        }
+                                    ],
+                                },
+                            ],
+                        },
+                        {
+                            "component": "VRow",
+                            "content": [
+                                {
+                                    "component": "VCol",
+                                    "props": {
+                                        "cols": 12,
+                                    },
+                                    "content": [
+                                        {
+                                            "component": "VAlert",
+                                            "props": {
+                                                "type": "info",
+                                                "variant": "tonal",
+                                                "text": "历史保留策略在每次同步完成后于后台执行，被清理的记录仍会用于去重，不会被重复处理；未识别记录超过归档天数后移到归档库",
+                                            },
+                                        }
+                                    ],
+                                }
                             ],
                         },
                         {
@@ -638,6 +2003,28 @@ class DoubanRankPlus2(_PluginBase):
                                                 },
                                             ],
                                         },
+                                        *(
+                                            {
+                                                "component": "VAlert",
+                                                "props": {
+                                                    "type": alert_type,
+                                                    "variant": "tonal",
+                                                    "class": "mt-2",
+                                                },
+                                                "content": [
+                                                    {
+                                                        "component": "p",
+                                                        "text": message,
+                                                    }
+                                                    for message in messages
+                                                ],
+                                            }
+                                            for alert_type, messages in (
+                                                ("error", self._feed_spec_errors),
+                                                ("warning", self._feed_spec_warnings),
+                                            )
+                                            if messages
+                                        ),
                                     ],
                                 }
                             ],
@@ -737,11 +2124,16 @@ class DoubanRankPlus2(_PluginBase):
                 "clear": False,
                 "clear_unrecognized": False,
                 "release_year": "0",
-                "sleep_time": "3,10",
+                "process_workers": "1",
+                "retention_days": "0",
+                "retention_count": "0",
+                "retention_latest_per_tmdbid": False,
+                "archive_unrecognized_days": "0",
+                "retry_budget": "20",
                 "is_seasons_all": True,
                 "is_only_movies": False,
+                "incremental": True,
                 "history_type": HistoryDataType.LATEST.value,
-                "is_exit_ip_rate_limit": False,
                 "migrate_from_url": "",
                 "migrate_api_token": "",
                 "migrate_once": False,
@@ -858,55 +2250,193 @@ class DoubanRankPlus2(_PluginBase):
                 },
             ],
         }
-        return total_elements
-
-    def __get_historys_statistics_content(
-        self,
-        historys_total,
-        historys_recognized_total,
-        historys_unrecognized_total,
-    ):
-        addr_list = self._rss_addrs + [
-            self._douban_address.get(rank) for rank in self._ranks
-        ]
-
-        # 数据统计
-        data_statistics = [
-            {
-                "title": "历史总计数量",
-                "value": historys_total,
-                "icon_name": Icons.STATISTICS,
-            },
-            {
-                "title": "已识别数量",
-                "value": historys_recognized_total,
-                "icon_name": Icons.RECOGNIZED,
-            },
-            {
-                "title": "未识别数量",
-                "value": historys_unrecognized_total,
-                "icon_name": Icons.UNRECOGNIZED,
-            },
-            {
-                "title": "榜单数量",
-                "value": len(addr_list),
-                "icon_name": Icons.RSS,
-            },
-        ]
-
-        content = list(
-            map(
-                lambda s: DoubanRankPlus2.__get_historys_statistic_content(
-                    title=s["title"],
-                    value=s["value"],
-                    icon_name=s["icon_name"],
-                ),
-                data_statistics,
-            )
-        )
-
-        component = {"component": "VRow", "content": content}
-        return component
+        return total_elements
+
+    def __get_historys_statistics_content(
+        self,
+        historys_total,
+        historys_recognized_total,
+        historys_unrecognized_total,
+    ):
+        # 数据统计
+        data_statistics = [
+            {
+                "title": "历史总计数量",
+                "value": historys_total,
+                "icon_name": Icons.STATISTICS,
+            },
+            {
+                "title": "已识别数量",
+                "value": historys_recognized_total,
+                "icon_name": Icons.RECOGNIZED,
+            },
+            {
+                "title": "未识别数量",
+                "value": historys_unrecognized_total,
+                "icon_name": Icons.UNRECOGNIZED,
+            },
+            {
+                "title": "榜单数量",
+                "value": len(self._feed_specs),
+                "icon_name": Icons.RSS,
+            },
+        ]
+
+        content = list(
+            map(
+                lambda s: DoubanRankPlus2.__get_historys_statistic_content(
+                    title=s["title"],
+                    value=s["value"],
+                    icon_name=s["icon_name"],
+                ),
+                data_statistics,
+            )
+        )
+
+        component = {"component": "VRow", "content": content}
+        return component
+
+    def __get_feed_snapshots_content(self) -> dict[str, Any] | None:
+        """
+        榜单变化统计
+        """
+        feed_snapshots: Dict[str, FeedSnapshot] = (
+            self.get_data("feed_snapshot") or {}
+        )
+        if not feed_snapshots:
+            return None
+
+        rows = [
+            {
+                "component": "tr",
+                "content": [
+                    {"component": "td", "text": snapshot.get("url", feed_id)},
+                    {"component": "td", "text": str(snapshot.get("total", 0))},
+                    {
+                        "component": "td",
+                        "text": str(snapshot.get("entered", 0)),
+                    },
+                    {"component": "td", "text": str(snapshot.get("left", 0))},
+                    {"component": "td", "text": snapshot.get("time", "")},
+                ],
+            }
+            for feed_id, snapshot in feed_snapshots.items()
+        ]
+
+        return {
+            "component": "div",
+            "content": [
+                {
+                    "component": "VCardTitle",
+                    "props": {
+                        "class": "pt-6 pb-2 px-0 text-base whitespace-nowrap"
+                    },
+                    "content": [{"component": "span", "text": "榜单变化"}],
+                },
+                {
+                    "component": "VTable",
+                    "props": {"hover": True, "density": "compact"},
+                    "content": [
+                        {
+                            "component": "thead",
+                            "content": [
+                                {
+                                    "component": "tr",
+                                    "content": [
+                                        {"component": "th", "text": text}
+                                        for text in [
+                                            "榜单",
+                                            "条目数",
+                                            "新上榜",
+                                            "下榜",
+                                            "更新时间",
+                                        ]
+                                    ],
+                                }
+                            ],
+                        },
+                        {"component": "tbody", "content": rows},
+                    ],
+                },
+            ],
+        }
+
+    def __get_run_metrics_content(self) -> dict[str, Any] | None:
+        """
+        最近运行统计
+        """
+        run_metrics: List[RunSummary] = self.get_data("run_metrics") or []
+        if not run_metrics:
+            return None
+
+        headers = (
+            ["时间", "状态", "耗时", "条目", "条目/秒"]
+            + list(RunMetrics.stage_names.values())
+            + ["识别缓存命中率", "重试", "预过滤"]
+        )
+        rows = []
+        for summary in reversed(run_metrics[-10:]):
+            stages = summary.get("stages") or {}
+            cells = [
+                summary.get("time", ""),
+                "完成" if summary.get("completed") else "未完成",
+                f"{summary.get('duration', 0):.1f}s",
+                str(summary.get("items", 0)),
+                str(summary.get("items_per_second", 0)),
+            ]
+            for name in RunMetrics.stage_names:
+                stage = stages.get(name)
+                cells.append(
+                    f"{stage['count']}次 / {stage['seconds']:.1f}s"
+                    if stage
+                    else "-"
+                )
+            cells += [
+                f"{summary.get('cache_hit_rate', 0) * 100:.0f}%",
+                str(summary.get("retries", 0)),
+                f"{summary.get('prefiltered', 0)}条 / "
+                f"省{sum((summary.get('saved_calls') or {}).values())}次",
+            ]
+            rows.append(
+                {
+                    "component": "tr",
+                    "content": [
+                        {"component": "td", "text": cell} for cell in cells
+                    ],
+                }
+            )
+
+        return {
+            "component": "div",
+            "content": [
+                {
+                    "component": "VCardTitle",
+                    "props": {
+                        "class": "pt-6 pb-2 px-0 text-base whitespace-nowrap"
+                    },
+                    "content": [{"component": "span", "text": "最近运行"}],
+                },
+                {
+                    "component": "VTable",
+                    "props": {"hover": True, "density": "compact"},
+                    "content": [
+                        {
+                            "component": "thead",
+                            "content": [
+                                {
+                                    "component": "tr",
+                                    "content": [
+                                        {"component": "th", "text": text}
+                                        for text in headers
+                                    ],
+                                }
+                            ],
+                        },
+                        {"component": "tbody", "content": rows},
+                    ],
+                },
+            ],
+        }
 
     def __get_history_post_content(self, history: HistoryPayload):
         title = history.get("title", "")
@@ -1036,8 +2566,47 @@ class DoubanRankPlus2(_PluginBase):
 
         return component
 
+    def __get_historys_more_content(
+        self, history_type: str, shown: int, total: int
+    ) -> dict[str, Any]:
+        """
+        历史记录只显示第一页，之后的记录通过 /history 接口按页查询
+        """
+        query = urlencode(
+            {
+                "apikey": settings.API_TOKEN,
+                "status": history_type,
+                "offset": shown,
+                "limit": self._history_page_size,
+            }
+        )
+        return {
+            "component": "div",
+            "props": {"class": "d-flex align-center justify-center ga-4 pb-4"},
+            "content": [
+                {
+                    "component": "span",
+                    "props": {"class": "text-caption"},
+                    "text": f"显示最近 {shown} 条，共 {total} 条",
+                },
+                {
+                    "component": "VBtn",
+                    "props": {
+                        "variant": "tonal",
+                        "size": "small",
+                        "href": f"{settings.API_V1_STR}/plugin/"
+                        f"{self._plugin_id}/history?{query}",
+                        "target": "_blank",
+                    },
+                    "text": "查看下一页",
+                },
+            ],
+        }
+
     def __get_historys_posts_content(
-        self, historys: List[HistoryPayload] | None
+        self,
+        historys: List[HistoryPayload] | None,
+        more_content: dict[str, Any] | None = None,
     ):
         posts_content = []
         if not historys:
@@ -1078,6 +2647,8 @@ class DoubanRankPlus2(_PluginBase):
                 },
             ],
         }
+        if more_content:
+            component["content"].append(more_content)
 
         return component
 
@@ -1087,8 +2658,8 @@ class DoubanRankPlus2(_PluginBase):
         """
 
         # 查询历史记录
-        historys = self.get_data("history")
-        if not historys:
+        historys_total = self._history.count() if self._history else 0
+        if not self._history or not historys_total:
             return [
                 {
                     "component": "div",
@@ -1099,59 +2670,63 @@ class DoubanRankPlus2(_PluginBase):
                 }
             ]
 
-        # 数据按时间降序排序
-        historys = sorted(
-            historys, key=lambda x: x.get("time_full"), reverse=True
-        )
-
-        history_recognized = []
-        history_unrecognized = []
-
-        for history in historys:
-            if history.get("status") != Status.UNRECOGNIZED.value:
-                history_recognized.append(history)
-            else:
-                history_unrecognized.append(history)
-
-        history_recognized = sorted(
-            history_recognized, key=lambda x: x.get("time_full"), reverse=True
+        historys_unrecognized_total = self._history.count(
+            status=Status.UNRECOGNIZED.value
         )
-        history_unrecognized = sorted(
-            history_unrecognized,
-            key=lambda x: x.get("time_full"),
-            reverse=True,
+        historys_recognized_total = (
+            historys_total - historys_unrecognized_total
         )
 
-        historys_total = len(historys)
-        historys_recognized_total = len(history_recognized)
-        historys_unrecognized_total = len(history_unrecognized)
-
+        # 数据按时间降序分页读取，只渲染第一页
         historys_in_type: list[HistoryPayload] | None = None
+        more_content = None
         if self._history_type == HistoryDataType.LATEST.value:
-            historys_in_type = historys[:12]
-        elif self._history_type == HistoryDataType.RECOGNIZED.value:
-            historys_in_type = history_recognized
-        elif self._history_type == HistoryDataType.UNRECOGNIZED.value:
-            historys_in_type = history_unrecognized
-        elif self._history_type == HistoryDataType.ALL.value:
-            historys_in_type = historys
+            historys_in_type = self._history.query(limit=12)
+        elif self._history_type in (
+            HistoryDataType.RECOGNIZED.value,
+            HistoryDataType.UNRECOGNIZED.value,
+            HistoryDataType.ALL.value,
+        ):
+            status, exclude_status = DoubanRankPlus2.__get_history_filter(
+                self._history_type
+            )
+            total = self._history.count(
+                status=status, exclude_status=exclude_status
+            )
+            historys_in_type = self._history.query(
+                limit=self._history_page_size,
+                status=status,
+                exclude_status=exclude_status,
+            )
+            if total > len(historys_in_type):
+                more_content = self.__get_historys_more_content(
+                    self._history_type, len(historys_in_type), total
+                )
 
         historys_posts_content = self.__get_historys_posts_content(
-            historys_in_type
+            historys_in_type, more_content
         )
         historys_statistics_content = self.__get_historys_statistics_content(
             historys_total,
             historys_recognized_total,
             historys_unrecognized_total,
         )
+        feed_snapshots_content = self.__get_feed_snapshots_content()
+        run_metrics_content = self.__get_run_metrics_content()
 
         # 拼装页面
         return [
             {
                 "component": "div",
                 "content": [
-                    historys_statistics_content,
-                    historys_posts_content,
+                    content
+                    for content in [
+                        historys_statistics_content,
+                        feed_snapshots_content,
+                        run_metrics_content,
+                        historys_posts_content,
+                    ]
+                    if content
                 ],
             }
         ]
@@ -1168,9 +2743,61 @@ class DoubanRankPlus2(_PluginBase):
                     self._scheduler.shutdown()
                     self._event.clear()
                 self._scheduler = None
+            if self._history:
+                self._history.close()
+            if self._http:
+                self._http.close()
         except Exception as e:
             print(str(e))
 
+    def __get_http(self) -> HttpClient:
+        """
+        获取HTTP连接池
+        """
+        if not self._http:
+            self._http = HttpClient(pool_maxsize=self._rss_fetch_per_host)
+        return self._http
+
+    def __init_rate_limiters(self):
+        """
+        初始化各上游的限流器，限流器在模块内共享
+        """
+        if "rsshub" not in _shared_rate_limiters:
+            _shared_rate_limiters["rsshub"] = RateLimiter(
+                self._rss_interval, burst=self._rss_fetch_per_host
+            )
+        if "tmdb" not in _shared_rate_limiters:
+            _shared_rate_limiters["tmdb"] = RateLimiter(
+                self._tmdb_interval, burst=self._tmdb_burst
+            )
+        self._rate_limiters = {
+            "rsshub": _shared_rate_limiters["rsshub"],
+            "tmdb": _shared_rate_limiters["tmdb"],
+        }
+
+    def __rate_limit(self, upstream: str):
+        """
+        请求上游前限流
+        """
+        limiter = self._rate_limiters.get(upstream)
+        if limiter:
+            waited = limiter.acquire(self._event)
+            if self._metrics:
+                self._metrics.add_throttled(upstream, waited)
+            if waited >= 1:
+                logger.debug(f"{upstream} 限流等待 {waited:.1f} 秒")
+
+    def __load_history_store(self):
+        """
+        加载历史记录存储，并迁移旧版本保存在插件数据中的历史记录
+        """
+        self._history = HistoryStore(self.get_data_path() / "history.db")
+        legacy_history = self.get_data("history")
+        if legacy_history and isinstance(legacy_history, list):
+            count = self._history.add_many(legacy_history)
+            self.del_data("history")
+            logger.info(f"已将 {count} 条历史记录迁移到索引存储")
+
     def __validate_token(self, api_token: str) -> Any:
         """
         验证 API 密钥
@@ -1187,25 +2814,122 @@ class DoubanRankPlus2(_PluginBase):
         validation_response = self.__validate_token(apikey)
         if validation_response:
             return validation_response
-        # 历史记录
-        historys = self.get_data("history")
-        if not historys:
-            return Response(success=False, message="未找到历史记录")
         # 删除指定记录
-        historys = [h for h in historys if h.get("unique") != key]
-        self.save_data("history", historys)
+        if not self._history or not self._history.delete(key):
+            return Response(success=False, message="未找到历史记录")
+        # 使删除的记录下次运行时能重新处理
+        self.__invalidate_feed_item(key)
         return Response(success=True, message="删除成功")
 
-    def get_migrate_history(self, migrate_api_token: str):
+    @staticmethod
+    def __get_history_filter(
+        history_type: str | None,
+    ) -> Tuple[str | None, str | None]:
+        """
+        历史类型对应的状态过滤条件 (status, exclude_status)
+        """
+        if history_type == HistoryDataType.RECOGNIZED.value:
+            return None, Status.UNRECOGNIZED.value
+        if history_type == HistoryDataType.UNRECOGNIZED.value:
+            return Status.UNRECOGNIZED.value, None
+        if history_type in {s.value for s in Status}:
+            return history_type, None
+        return None, None
+
+    def get_history(
+        self,
+        apikey: str,
+        status: str | None = None,
+        offset: int = 0,
+        limit: int = 24,
+    ):
+        """
+        按时间降序分页查询历史记录，status 可以是历史类型或处理状态
+        """
+        validation_response = self.__validate_token(apikey)
+        if validation_response:
+            return validation_response
+        if not self._history:
+            return {"total": 0, "offset": 0, "limit": 0, "items": []}
+        offset = max(int(offset), 0)
+        limit = min(max(int(limit), 1), 200)
+        _status, exclude_status = DoubanRankPlus2.__get_history_filter(status)
+        return {
+            "total": self._history.count(
+                status=_status, exclude_status=exclude_status
+            ),
+            "offset": offset,
+            "limit": limit,
+            "items": self._history.query(
+                offset=offset,
+                limit=limit,
+                status=_status,
+                exclude_status=exclude_status,
+            ),
+        }
+
+    def __reset_feed_state(self):
+        """
+        清空榜单缓存和榜单快照，下次运行时重新处理所有榜单条目
+        """
+        self.save_data("feed_cache", {})
+        self.save_data("feed_snapshot", {})
+
+    def __invalidate_feed_item(self, unique: str):
+        """
+        从包含该条目的榜单快照中移除条目，并清理这些榜单的缓存，下次运行时只重新处理该条目
+        """
+        match = re.match(
+            rf"^{re.escape(self.plugin_config_prefix)}(.*)_[^_]*_\(DB:(.*)\)$", unique
+        )
+        if not match:
+            self.__reset_feed_state()
+            return
+        title, douban_id = match.groups()
+        item_id = douban_id if douban_id and douban_id != "None" else title
+
+        feed_snapshots: Dict[str, FeedSnapshot] = self.get_data("feed_snapshot") or {}
+        feed_cache: Dict[str, FeedCache] = self.get_data("feed_cache") or {}
+        for feed_id, snapshot in feed_snapshots.items():
+            if item_id in (snapshot.get("ids") or []):
+                snapshot["ids"] = [_id for _id in snapshot["ids"] if _id != item_id]
+                feed_cache.pop(feed_id, None)
+        self.save_data("feed_cache", feed_cache)
+        self.save_data("feed_snapshot", feed_snapshots)
+
+    def get_run_metrics(self, apikey: str):
+        """
+        获取最近运行的统计，按时间降序
+        """
+        validation_response = self.__validate_token(apikey)
+        if validation_response:
+            return validation_response
+        run_metrics: List[RunSummary] = self.get_data("run_metrics") or []
+        return list(reversed(run_metrics))
+
+    def get_migrate_history(
+        self,
+        migrate_api_token: str,
+        after: int | None = None,
+        limit: int | None = None,
+    ):
         """
-        获取迁移l历史记录
+        获取迁移历史记录，传入 limit 时按游标分页返回，否则返回全部记录
         """
         logger.debug("获取迁移历史记录")
         validation_response = self.__validate_token(migrate_api_token)
         if validation_response:
             return validation_response
 
-        return self.get_data("history")
+        if not limit:
+            return self._history.query() if self._history else []
+        if not self._history:
+            return {"items": [], "next": None}
+        items, next_after = self._history.query_after(
+            max(int(after or 0), 0), min(max(int(limit), 1), 2000)
+        )
+        page: MigrateHistoryPage = {"items": items, "next": next_after}
+        return page
 
     def get_migrate_config(self, migrate_api_token: str):
         """
@@ -1237,10 +2961,16 @@ class DoubanRankPlus2(_PluginBase):
             "clear_unrecognized": self._clear_unrecognized,
             "is_seasons_all": self._is_seasons_all,
             "is_only_movies": self._is_only_movies,
+            "incremental": self._incremental,
             "release_year": str(self._release_year),
-            "sleep_time": f"{self._min_sleep_time},{self._max_sleep_time}",
+            "process_workers": str(self._process_workers),
+            "retention_days": str(self._retention_days),
+            "retention_count": str(self._retention_count),
+            "retention_latest_per_tmdbid": self._retention_latest_per_tmdbid,
+            "archive_unrecognized_days": str(self._archive_unrecognized_days),
+            "retry_budget": str(self._retry_budget),
             "history_type": self._history_type,
-            "is_exit_ip_rate_limit": self._is_exit_ip_rate_limit,
+            "proxy": self._proxy,
             "migrate_from_url": self._migrate_from_url.rstrip("/"),
             "migrate_api_token": self._migrate_api_token,
             "migrate_once": self._migrate_once,
@@ -1256,59 +2986,98 @@ class DoubanRankPlus2(_PluginBase):
 
     def __start_task(self):
         """
-        运行任务
+        运行任务，并记录本次运行的统计
+        """
+        self._metrics = RunMetrics()
+        try:
+            self.__run_task()
+        finally:
+            self.__save_run_metrics()
+            if self._history:
+                self._history.flush()
+            self.__start_compaction()
+
+    def __start_compaction(self):
+        """
+        同步完成后在后台压缩历史记录，不阻塞同步任务
+        """
+        if not self._history or not (
+            self._retention_days
+            or self._retention_count
+            or self._retention_latest_per_tmdbid
+            or self._archive_unrecognized_days
+        ):
+            return
+        if self._compact_thread and self._compact_thread.is_alive():
+            return
+        self._compact_thread = Thread(
+            target=self.__compact_history,
+            name="doubanrankplus-compact",
+            daemon=True,
+        )
+        self._compact_thread.start()
+
+    def __compact_history(self):
+        """
+        按保留策略压缩历史记录
+        """
+        history = self._history
+        if not history:
+            return
+
+        def __get_before(days: int) -> str | None:
+            if not days:
+                return None
+            return (
+                datetime.datetime.now(tz=pytz.timezone(settings.TZ))
+                - datetime.timedelta(days=days)
+            ).strftime("%Y-%m-%d %H:%M:%S")
+
+        try:
+            result = history.compact(
+                expire_before=__get_before(self._retention_days),
+                max_count=self._retention_count,
+                latest_per_tmdbid=self._retention_latest_per_tmdbid,
+                archive_unrecognized_before=__get_before(
+                    self._archive_unrecognized_days
+                ),
+            )
+            history.flush()
+            if any(result.values()):
+                logger.info(
+                    f"历史记录压缩完成：归档未识别 {result['archived']} 条，"
+                    f"过期 {result['expired']} 条，同一媒体旧记录 {result['duplicated']} 条，"
+                    f"超出数量 {result['overflow']} 条"
+                )
+        except Exception as e:
+            logger.error(f"历史记录压缩出错：{str(e)}")
+
+    def __run_task(self):
+        """
+        刷新所有榜单
         """
         if self._migrate_once:
             if self._migrate_from_url and self._migrate_api_token:
                 logger.info("开始从原MP迁移配置...")
                 __original_config = self.__get_migrate_config()
                 if __original_config and isinstance(__original_config, dict):
-                    self._enabled = __original_config.get(
-                        "enabled", self._enabled
-                    )
-                    self._cron = __original_config.get("cron", self._cron)
-                    self._onlyonce = __original_config.get(
-                        "onlyonce", self._onlyonce
-                    )
-                    self._vote = __original_config.get("vote", self._vote)
-                    self._ranks = __original_config.get("ranks", self._ranks)
-                    self._rss_addrs = __original_config.get(
-                        "rss_addrs", self._rss_addrs
-                    ).split("\n")
-                    self._clear = __original_config.get("clear", self._clear)
-                    self._clear_unrecognized = __original_config.get(
-                        "clear_unrecognized", self._clear_unrecognized
-                    )
-                    self._is_seasons_all = __original_config.get(
-                        "is_seasons_all", self._is_seasons_all
-                    )
-                    self._is_only_movies = __original_config.get(
-                        "_is_only_movies", self._is_only_movies
-                    )
-
-                    self._release_year = __original_config.get(
-                        "release_year", self._release_year
-                    )
-                    self._min_sleep_time, self._max_sleep_time = map(
-                        int,
-                        __original_config.get(
-                            "sleep_time", self._min_sleep_time
-                        ).split(","),
-                    )
-                    self._history_type = __original_config.get(
-                        "history_type", self._history_type
-                    )
-                    self._is_exit_ip_rate_limit = __original_config.get(
-                        "is_exit_ip_rate_limit", self._is_exit_ip_rate_limit
+                    # 只迁移原MP的榜单和订阅配置，其余配置保持不变
+                    __config = self.__get_config()
+                    __config.update(
+                        {
+                            key: __original_config[key]
+                            for key in self._migrate_config_keys
+                            if key in __original_config
+                        }
                     )
+                    self.__apply_config(__config)
+                    self.__compile_feed_specs()
+                    self.__init_rate_limiters()
                 else:
                     logger.warn("未获取到原MP配置，结束程序")
                     return
 
-                __original_history = self.__get_migrate_history()
-                if __original_history:
-                    self.save_data("history", __original_history)
-                else:
+                if not self.__migrate_history():
                     logger.warn("未获取到历史记录，结束程序")
                     return
 
@@ -1323,271 +3092,773 @@ class DoubanRankPlus2(_PluginBase):
                 return
 
         logger.info("开始刷新豆瓣榜单Plus ...")
-        addr_list = self._rss_addrs + [
-            self._douban_address.get(rank) for rank in self._ranks
-        ]
-        if not addr_list:
+        feed_specs = self._feed_specs
+        if not feed_specs:
             logger.info("未设置榜单RSS地址")
             return
         else:
-            logger.info(f"共 {len(addr_list)} 个榜单RSS地址需要刷新")
+            logger.info(f"共 {len(feed_specs)} 个榜单RSS地址需要刷新")
+
+        if not self._history:
+            logger.error("历史记录存储未加载，结束程序")
+            return
+        history = self._history
 
-        # 读取历史记录
+        if not self._recognize_cache:
+            self._recognize_cache = _shared_recognize_cache
+            self._recognize_cache.update(self.get_data("recognize_cache"))
+        recognize_cache = self._recognize_cache
+
+        # 清理历史记录
         if self._clearflag:
-            history = []  # type: ignore
-            self.save_data("history", history)
+            history.clear()
+            # 历史清理后需要重新处理所有榜单，未识别的条目重新识别
+            self.__reset_feed_state()
+            recognize_cache.clear_negative()
             # 历史只清理一次
             self._clearflag = False
             logger.info(f"已清理所有 {self.plugin_name} 的历史记录")
+        elif self._clearflag_unrecognized:
+            deleted_count = history.delete_by_status(Status.UNRECOGNIZED.value)
+            # 未识别历史清理后需要重新处理所有榜单，并重新识别
+            self.__reset_feed_state()
+            recognize_cache.clear_negative()
+            # 未识别历史只清理一次
+            self._clearflag_unrecognized = False
+            logger.info(
+                f"已清理 {deleted_count} 条 {self.plugin_name} 未识别的历史记录"
+            )
+
+        # 读取榜单缓存和榜单快照，按榜单ID保存，已移除的榜单不再保留
+        # 过滤条件变化的榜单不使用缓存
+        feed_ids = {spec["id"] for spec in feed_specs}
+        feed_cache: Dict[str, FeedCache] = {
+            feed_id: cache
+            for feed_id, cache in (self.get_data("feed_cache") or {}).items()
+            if feed_id in feed_ids
+        }
+        feed_snapshots: Dict[str, FeedSnapshot] = {
+            feed_id: snapshot
+            for feed_id, snapshot in (
+                self.get_data("feed_snapshot") or {}
+            ).items()
+            if feed_id in feed_ids
+        }
+        addr_caches: List[FeedCache | None] = []
+        for spec in feed_specs:
+            cache = feed_cache.get(spec["id"])
+            addr_caches.append(
+                cache if cache and cache.get("filter") == spec["filter"] else None
+            )
+
+        # 并发获取所有榜单RSS，结果与榜单地址顺序一致
+        fetch_results = self.__get_rss_infos(
+            [spec["url"] for spec in feed_specs], addr_caches
+        )
+
+        metrics = self._metrics or RunMetrics()
+        for addr_index, (spec, fetch_result) in enumerate(
+            zip(feed_specs, fetch_results, strict=True)
+        ):
+            if self._event.is_set():
+                logger.info("订阅服务停止")
+                return
+
+            addr = spec["url"]
+            feed_id = spec["id"]
+            rss_infos = fetch_result.get("rss_infos")
+            new_cache = fetch_result.get("cache")
+            if new_cache:
+                new_cache["filter"] = spec["filter"]
+
+            if fetch_result.get("not_modified"):
+                logger.info(f"RSS地址：{addr} ，内容未变化，跳过处理")
+                metrics.set_feed(spec, "未变化", 0, 0, 0)
+                if new_cache:
+                    feed_cache[feed_id] = new_cache
+                    self.save_data("feed_cache", feed_cache)
+                snapshot = feed_snapshots.get(feed_id)
+                if snapshot:
+                    snapshot.update(
+                        {"entered": 0, "left": 0, "time": self.__get_now()}
+                    )
+                    self.save_data("feed_snapshot", feed_snapshots)
+                continue
+
+            new_snapshot: FeedSnapshot | None = None
+            feed_start = time.perf_counter()
+            feed_status = "出错"
+            feed_total = len(rss_infos or [])
+            feed_processed = 0
+
+            try:
+                customize_save_paths = spec["save_paths"]
+                subscription_type = spec["subscription_type"]
+
+                if not rss_infos:
+                    logger.error(f"RSS地址：{addr} ，未查询到数据")
+                    feed_status = "无数据"
+                    continue
+                else:
+                    logger.info(
+                        f"RSS地址：{addr} ，共 {len(rss_infos)} 条数据"
+                    )
+
+                # 与上次的榜单快照比较，增量模式只处理新上榜的条目
+                rss_infos, new_snapshot = self.__diff_feed_snapshot(
+                    rss_infos, feed_snapshots.get(feed_id), spec
+                )
+                logger.info(
+                    f"RSS地址：{addr} ，新上榜 {new_snapshot['entered']} 条，"
+                    f"下榜 {new_snapshot['left']} 条，需要处理 {len(rss_infos)} 条"
+                )
+
+                # 筛选未处理过的条目
+                rank_items: List[RankItem] = []
+                rank_unique_flags = set()
+                for rss_info in rss_infos:
+                    logger.debug(f"rss_info:::{rss_info}")
+                    rank_item = self.__get_rank_item(rss_info)
+                    if not rank_item:
+                        continue
+                    unique_flag = rank_item["unique"]
+                    # 在历史记录中查找 unique_flag
+                    if (
+                        unique_flag in rank_unique_flags
+                        or history.exists(unique_flag)
+                    ):
+                        logger.info(
+                            f"已处理过: Title: {rank_item['title']}, Year:{rank_item['year']}, DBID:{rank_item['doubanid']}"
+                        )
+                        continue
+                    rank_unique_flags.add(unique_flag)
+                    rank_items.append(rank_item)
+
+                # 识别和检查媒体库可并发执行，订阅和历史记录按顺序写入
+                for rank_item_index, prepared in enumerate(
+                    self.__iter_prepared_rank_items(
+                        rank_items, subscription_type
+                    )
+                ):
+                    if self._event.is_set() or not prepared:
+                        logger.info("订阅服务停止")
+                        feed_status = "中断"
+                        return
+
+                    feed_processed += 1
+                    logger.info(
+                        f"第 {addr_index + 1}/{len(feed_specs)} 条订阅数据处理进度: {rank_item_index + 1}/{len(rank_items)}"
+                    )
+
+                    if not self.__handle_prepared_item(
+                        prepared, customize_save_paths, metrics
+                    ):
+                        # 未识别的条目加入重试队列
+                        history.add_retry(
+                            self.__get_retry_payload(
+                                prepared["item"],
+                                customize_save_paths,
+                                subscription_type,
+                            )
+                        )
+
+                # 榜单全部处理完成后才记录缓存和快照，中断时下次仍会重新处理
+                if new_cache:
+                    feed_cache[feed_id] = new_cache
+                if new_snapshot:
+                    feed_snapshots[feed_id] = new_snapshot
+                feed_status = "已处理"
+
+            except Exception as e:
+                logger.error(f"处理RSS地址：{addr} 出错: {str(e)}")
+            finally:
+                metrics.set_feed(
+                    spec,
+                    feed_status,
+                    feed_total,
+                    feed_processed,
+                    time.perf_counter() - feed_start,
+                )
+                # 保存榜单缓存、榜单快照和识别缓存
+                self.save_data("feed_cache", feed_cache)
+                self.save_data("feed_snapshot", feed_snapshots)
+                self.save_data("recognize_cache", recognize_cache.to_dict())
+
+        logger.info(
+            f"识别缓存命中 {metrics.cache_hits} 次，未命中 {metrics.cache_misses} 次"
+        )
+        logger.info(
+            "限流等待时间："
+            + "，".join(
+                f"{upstream} {metrics.throttled.get(upstream, 0.0):.1f} 秒"
+                for upstream in self._rate_limiters
+            )
+        )
+        # 重试到期的未识别条目
+        self.__retry_unrecognized(metrics)
+        if self._event.is_set():
+            return
+
+        logger.info(
+            f"识别前过滤 {metrics.prefiltered} 个条目，共省去"
+            f"媒体识别 {metrics.saved_calls.get('recognize', 0)} 次，"
+            f"媒体库检查 {metrics.saved_calls.get('no_exists', 0)} 次"
+        )
+        metrics.completed = True
+        logger.info("所有榜单RSS刷新完成")
+
+    def __stage(self, name: str):
+        """
+        统计本次运行中一个阶段的耗时，未在运行时不统计
+        """
+        return self._metrics.stage(name) if self._metrics else nullcontext()
+
+    def __save_run_metrics(self):
+        """
+        保存本次运行的统计，只保留最近的若干次
+        """
+        if not self._metrics:
+            return
+        summary = self._metrics.to_summary()
+        self._metrics = None
+        run_metrics: List[RunSummary] = self.get_data("run_metrics") or []
+        run_metrics.append(summary)
+        self.save_data("run_metrics", run_metrics[-self._run_metrics_limit :])
+        logger.info(
+            f"本次运行耗时 {summary['duration']:.1f} 秒，处理 {summary['items']} 条，"
+            f"{summary['items_per_second']} 条/秒，各阶段耗时："
+            + "，".join(
+                f"{RunMetrics.stage_names.get(name, name)} {stage['count']} 次 {stage['seconds']:.1f} 秒"
+                for name, stage in summary["stages"].items()
+            )
+        )
+
+    def __handle_prepared_item(
+        self,
+        prepared: PreparedRankItem,
+        customize_save_paths: Dict[str, str] | None,
+        metrics: RunMetrics,
+    ) -> bool:
+        """
+        添加订阅并写入历史记录，返回是否识别到媒体信息
+        """
+        history = self._history
+        rank_item = prepared["item"]
+        title = rank_item["title"]
+        year = rank_item["year"]
+        douban_id = rank_item["doubanid"]
+        unique_flag = rank_item["unique"]
+        meta = prepared["meta"]
+        mediainfo = prepared["mediainfo"]
+        filter_status = prepared["filter_status"]
+
+        if prepared["skip"]:
+            return True
+
+        if not mediainfo and filter_status:
+            # 识别前已过滤的条目按榜单信息存储历史记录
+            history_payload = DoubanRankPlus2.__get_history_unrecognized_payload(
+                title, unique_flag, year, douban_id, filter_status
+            )
+            history.add(history_payload)
+            logger.debug(f"已添加到历史：{history_payload}")
+            return True
+
+        if not mediainfo:
+            # 存储未识别历史记录
+            history_payload = DoubanRankPlus2.__get_history_unrecognized_payload(
+                title, unique_flag, year, douban_id
+            )
+            history.add(history_payload)
+            logger.debug(f"已添加到未识别历史：{history_payload}")
+            return False
+
+        is_exist_all = prepared["is_exist_all"]
+        missing_season = prepared["missing_season"]
+
+        # 保存路径
+        save_path = None
+        if customize_save_paths and isinstance(
+            customize_save_paths, dict
+        ):
+            if mediainfo.type == MediaType.TV:
+                save_path = customize_save_paths.get("tv")
+            elif mediainfo.type == MediaType.MOVIE:
+                save_path = customize_save_paths.get("movie")
+
+        number_of_seasons = mediainfo.number_of_seasons
+        logger.debug(f"number_of_seasons:::{number_of_seasons}")
+
+        # 已识别状态默认值
+        status = Status.UNCATEGORIZED
+
+        if filter_status:
+            # 年份或评分不符合要求，不添加订阅
+            status = filter_status
+        # 如果是剧集且开启全季订阅，则轮流下载每一季
+        elif (
+            self._is_seasons_all
+            and mediainfo.type == MediaType.TV
+            and number_of_seasons
+            and not is_exist_all
+        ):
+            logger.debug(
+                f"meta.begin_season:::{meta.begin_season}"
+            )
+            genre_ids = mediainfo.genre_ids
+            ANIME_GENRE_ID = 16
+            logger.debug(
+                f"{mediainfo.title_year} genre_ids::: {genre_ids}"
+            )
+            if (
+                ANIME_GENRE_ID in genre_ids
+                and customize_save_paths
+                and isinstance(customize_save_paths, dict)
+            ):
+                save_path = customize_save_paths.get("anime")
+                logger.info(
+                    f"{mediainfo.title_year} 为动漫类别, 动漫自定义保存路径为: {save_path}"
+                )
+
+            logger.debug(
+                f"开始添加 {mediainfo.title_year} 共{number_of_seasons}季订阅"
+            )
+            with metrics.stage("subscribe"):
+                seasons_status = self.__checke_and_add_subscribes(
+                    meta=meta,
+                    mediainfo=mediainfo,
+                    seasons=list(range(1, number_of_seasons + 1)),
+                    save_path=save_path,
+                    is_exist_all=is_exist_all,
+                    missing_season=missing_season,
+                )
+            if meta.begin_season:
+                status = seasons_status.get(
+                    meta.begin_season, status
+                )
+            else:
+                status = seasons_status[number_of_seasons]
         else:
-            history = self.get_data("history") or []
-            if history and self._clearflag_unrecognized:
-                original_length = len(history)
-                history = [
-                    h
-                    for h in history
-                    if h.get("status") != Status.UNRECOGNIZED.value
-                ]
-                deleted_count = original_length - len(history)
-                self.save_data("history", history)
-                # 未识别历史只清理一次
-                self._clearflag_unrecognized = False
-                logger.info(
-                    f"已清理 {deleted_count} 条 {self.plugin_name} 未识别的历史记录"
+            with metrics.stage("subscribe"):
+                status = self.__checke_and_add_subscribe(
+                    meta=meta,
+                    mediainfo=mediainfo,
+                    season=meta.begin_season,
+                    save_path=save_path,
+                    is_exist_all=is_exist_all,
+                    missing_season=missing_season,
                 )
 
-        # 提取 history 中的 unique 值到一个集合中
-        unique_flags = {h.get("unique") for h in history if h is not None}
+        # 存储历史记录
+        history_payload = {
+            "title": title,
+            "type": mediainfo.type.value,
+            "year": mediainfo.year,
+            "poster": mediainfo.get_poster_image(),
+            "overview": mediainfo.overview,
+            "tmdbid": str(mediainfo.tmdb_id) or "0",
+            "doubanid": douban_id or "0",
+            "unique": unique_flag,
+            "time": datetime.datetime.now(
+                tz=pytz.timezone(settings.TZ)
+            ).strftime("%m-%d %H:%M"),
+            "time_full": datetime.datetime.now(
+                tz=pytz.timezone(settings.TZ)
+            ).strftime("%Y-%m-%d %H:%M:%S"),
+            "vote": mediainfo.vote_average,
+            "status": status.value,
+        }
+        history.add(history_payload)
+        logger.debug(f"已添加到历史：{history_payload}")
+        return True
 
-        # 初始化豆瓣IP限制判断
-        douban_last_ip_rate_limit_datetime = None
-        douban_ip_rate_limit_times = 0
+    def __get_retry_payload(
+        self,
+        rank_item: RankItem,
+        customize_save_paths: Dict[str, str] | None,
+        subscription_type: str | None,
+        attempts: int = 1,
+    ) -> RetryPayload:
+        """
+        获取未识别重试队列条目，下次重试时间按重试次数指数增长
+        """
+        return {
+            "unique": rank_item["unique"],
+            "title": rank_item["title"],
+            "year": rank_item["year"],
+            "doubanid": rank_item["doubanid"],
+            "mtype": rank_item["mtype"].value if rank_item["mtype"] else None,
+            "customize_save_paths": customize_save_paths,
+            "subscription_type": subscription_type,
+            "attempts": attempts,
+            "next_time": time.time()
+            + self._retry_interval * 2 ** (attempts - 1),
+        }
 
-        # count_addr_list = 0
-        for addr_index, _addr in enumerate(addr_list):
-            # count_addr_list += 1
-            # if addr_index == 5 or addr_index == 5:
-            #     break
+    def __retry_unrecognized(self, metrics: RunMetrics):
+        """
+        按预算重试到期的未识别条目，识别成功后按正常流程订阅并更新历史记录
+        """
+        history = self._history
+        if not history or self._retry_budget <= 0:
+            return
+        retries = history.get_due_retries(time.time(), self._retry_budget)
+        if not retries:
+            return
+        logger.info(
+            f"开始重试 {len(retries)} 个未识别条目，队列中共 {history.count_retries()} 个"
+        )
 
-            if not _addr:
-                continue
-            try:
-                logger.info(f"获取RSS：{_addr} ...")
-                addr_result = DoubanRankPlus2.__get_info_addr(_addr)
-                addr = addr_result.get("addr", None)
-                customize_save_paths = addr_result.get(
-                    "customize_save_paths", None
+        # 按订阅类型分组，与榜单处理使用相同的识别和订阅流程
+        groups: Dict[str | None, List[RetryPayload]] = {}
+        for retry in retries:
+            groups.setdefault(retry.get("subscription_type"), []).append(retry)
+
+        promoted = 0
+        for subscription_type, group in groups.items():
+            rank_items: List[RankItem] = []
+            for retry in group:
+                mtype = MediaType(retry["mtype"]) if retry.get("mtype") else None
+                rank_items.append(
+                    {
+                        "title": retry["title"],
+                        "year": retry["year"],
+                        "doubanid": retry["doubanid"],
+                        "mtype": mtype,
+                        "unique": retry["unique"],
+                    }
                 )
-                subscription_type = addr_result.get("subscription_type", None)
-
-                logger.debug(f"addr::: {addr}")
-                logger.debug(f"customize_save_paths::: {customize_save_paths}")
-                logger.debug(f"subscription_type::: {subscription_type}")
+                # 重试时不使用未识别的识别缓存
+                if self._recognize_cache:
+                    self._recognize_cache.discard_negative(
+                        RecognizeCache.get_key(retry["title"], retry["year"], mtype)
+                    )
+            metrics.add_retry(len(rank_items))
 
-                rss_infos = self.__get_rss_info(addr)
-                if not rss_infos:
-                    logger.error(f"RSS地址：{addr} ，未查询到数据")
+            for retry, prepared in zip(
+                group,
+                self.__iter_prepared_rank_items(rank_items, subscription_type),
+                strict=True,
+            ):
+                if self._event.is_set() or not prepared:
+                    logger.info("订阅服务停止")
+                    return
+                if self.__handle_prepared_item(
+                    prepared, retry.get("customize_save_paths"), metrics
+                ):
+                    history.delete_retry(retry["unique"])
+                    promoted += 1
                     continue
-                else:
+                attempts = retry.get("attempts", 1) + 1
+                if attempts > self._retry_max_attempts:
+                    history.delete_retry(retry["unique"])
                     logger.info(
-                        f"RSS地址：{addr} ，共 {len(rss_infos)} 条数据"
+                        f"{retry['title']} 已重试 {self._retry_max_attempts} 次仍未识别，不再重试"
                     )
-
-                for rss_info_index, rss_info in enumerate(rss_infos):
-                    if self._event.is_set():
-                        logger.info("订阅服务停止")
-                        return
-                    mtype = None
-
-                    logger.info(
-                        f"第 {addr_index + 1}/{len(addr_list)} 条订阅数据处理进度: {rss_info_index + 1}/{len(rss_infos)}"
+                    continue
+                history.add_retry(
+                    self.__get_retry_payload(
+                        prepared["item"],
+                        retry.get("customize_save_paths"),
+                        subscription_type,
+                        attempts,
                     )
+                )
 
-                    logger.debug(f"rss_info:::{rss_info}")
-                    title = rss_info.get("title")
-                    if not title:
-                        logger.warn("标题为空，无法处理")
-                        continue
+        logger.info(f"未识别条目重试完成，{promoted} 个识别成功")
 
-                    douban_id = rss_info.get("doubanid")
-                    year = rss_info.get("year")
-                    type_str = rss_info.get("mtype")
+    def __diff_feed_snapshot(
+        self,
+        rss_infos: List[RssInfo],
+        snapshot: FeedSnapshot | None,
+        spec: FeedSpec,
+    ) -> Tuple[List[RssInfo], FeedSnapshot]:
+        """
+        与上次的榜单快照比较，返回需要处理的条目和新的快照
+        """
+        ids = [
+            rss_info.get("doubanid") or rss_info.get("title") or ""
+            for rss_info in rss_infos
+        ]
+        last_ids = (
+            set(snapshot.get("ids") or [])
+            if snapshot and snapshot.get("filter") == spec["filter"]
+            else None
+        )
 
-                    if type_str == "movie":
-                        mtype = MediaType.MOVIE
-                    elif type_str:
-                        mtype = MediaType.TV
-                    unique_flag = f"{self.plugin_config_prefix}{title}_{year}_(DB:{douban_id})"
-                    logger.debug(f"unique_flag:::{unique_flag}")
+        if last_ids is None:
+            # 首次运行或条件变化时处理全部条目
+            entered_infos = rss_infos
+            left_count = 0
+        else:
+            entered_infos = [
+                rss_info
+                for rss_info, _id in zip(rss_infos, ids, strict=True)
+                if _id not in last_ids
+            ]
+            left_count = len(last_ids - set(ids))
+
+        new_snapshot: FeedSnapshot = {
+            "url": spec["url"],
+            "ids": ids,
+            "filter": spec["filter"],
+            "total": len(rss_infos),
+            "entered": len(entered_infos),
+            "left": left_count,
+            "time": self.__get_now(),
+        }
+        if not self._incremental:
+            return rss_infos, new_snapshot
+        return entered_infos, new_snapshot
 
-                    # 在集合中查找 unique_flag
-                    if unique_flag in unique_flags:
-                        logger.info(
-                            f"已处理过: Title: {title}, Year:{year}, DBID:{douban_id}"
-                        )
-                        continue
+    @staticmethod
+    def __get_now() -> str:
+        return datetime.datetime.now(tz=pytz.timezone(settings.TZ)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
 
-                    logger.info(
-                        f"开始处理: Title: {title}, Year:{year}, DBID:{douban_id}, Type:{mtype}"
-                    )
-                    # 元数据
-                    meta = MetaInfo(title)
-                    meta.year = year
-                    if mtype:
-                        meta.type = mtype
-                    logger.debug(f"MetaInfo meta from rss_info title:::{meta}")
-
-                    # === 修改后：彻底放弃请求豆瓣 API，直接利用 RSS 现有的 Title 和 Year 进行 TMDB 文本识别 ===
-                    logger.info(f"绕过豆瓣 API，直接通过文本识别: Title: {title}, Year: {year}")
-                    
-                    mediainfo = self.chain.recognize_media(meta=meta)
-
-                    if not mediainfo:
-                        logger.warn(f"未识别到 {title} 的媒体信息")
-                        # 存储未识别历史记录
-                        history_payload = DoubanRankPlus2.__get_history_unrecognized_payload(
-                            title, unique_flag, year, douban_id
-                        )
-                        history.append(history_payload)
-                        unique_flags.add(unique_flag)
-                        logger.debug(f"已添加到未识别历史：{history_payload}")
-                        continue
-                    # === 修改结束 ===
+    def __get_rank_item(self, rss_info: RssInfo) -> RankItem | None:
+        """
+        从RSS条目获取榜单条目信息
+        """
+        title = rss_info.get("title")
+        if not title:
+            logger.warn("标题为空，无法处理")
+            return None
+
+        douban_id = rss_info.get("doubanid")
+        year = rss_info.get("year")
+        type_str = rss_info.get("mtype")
+
+        mtype = None
+        if type_str == "movie":
+            mtype = MediaType.MOVIE
+        elif type_str:
+            mtype = MediaType.TV
+        unique_flag = (
+            f"{self.plugin_config_prefix}{title}_{year}_(DB:{douban_id})"
+        )
+        logger.debug(f"unique_flag:::{unique_flag}")
 
-                    # logger.debug(f"{mediainfo}:::{mediainfo}")
-                    logger.debug(f"{meta}:::{meta}")
-                    logger.info(
-                        f"已识别到 {title} ({year}) 的媒体信息: {mediainfo.title_year}, 类型: {mediainfo.type}"
-                    )
+        return {
+            "title": title,
+            "year": year,
+            "doubanid": douban_id,
+            "mtype": mtype,
+            "unique": unique_flag,
+        }
 
-                    if self._is_only_movies and mediainfo.type == MediaType.TV:
-                        logger.info(f"仅下载电影，跳过 {mediainfo.title_year}")
-                        continue
+    def __iter_prepared_rank_items(
+        self, rank_items: List[RankItem], subscription_type: str | None
+    ) -> Iterator[PreparedRankItem | None]:
+        """
+        识别榜单条目并检查媒体库，处理线程数大于1时并发执行，按输入顺序返回
+        """
+        if self._process_workers <= 1:
+            for rank_item in rank_items:
+                yield self.__prepare_rank_item(rank_item, subscription_type)
+            return
 
-                    if subscription_type:
-                        if (
-                            subscription_type == "movies"
-                            and mediainfo.type == MediaType.TV
-                        ):
-                            logger.info(
-                                f"仅下载电影，跳过 {mediainfo.title_year}"
-                            )
-                            continue
-                        if (
-                            subscription_type == "tv"
-                            and mediainfo.type == MediaType.MOVIE
-                        ):
-                            logger.info(
-                                f"仅下载剧集，跳过 {mediainfo.title_year}"
-                            )
-                            continue
+        executor = ThreadPoolExecutor(
+            max_workers=self._process_workers,
+            thread_name_prefix="doubanrankplus-item",
+        )
+        try:
+            futures = [
+                executor.submit(
+                    self.__prepare_rank_item, rank_item, subscription_type
+                )
+                for rank_item in rank_items
+            ]
+            for future in futures:
+                yield future.result()
+        finally:
+            # 停止时取消尚未开始的任务
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __prepare_rank_item(
+        self, rank_item: RankItem, subscription_type: str | None
+    ) -> PreparedRankItem | None:
+        """
+        识别榜单条目的媒体信息，过滤类型并检查媒体库，不写入订阅和历史记录
+        """
+        if self._event.is_set():
+            return None
 
-                    # 保存路径
-                    save_path = None
-                    if customize_save_paths and isinstance(
-                        customize_save_paths, dict
-                    ):
-                        if mediainfo.type == MediaType.TV:
-                            save_path = customize_save_paths.get("tv")
-                        elif mediainfo.type == MediaType.MOVIE:
-                            save_path = customize_save_paths.get("movie")
+        title = rank_item["title"]
+        year = rank_item["year"]
+        douban_id = rank_item["doubanid"]
+        mtype = rank_item["mtype"]
 
-                    number_of_seasons = mediainfo.number_of_seasons
-                    logger.debug(f"number_of_seasons:::{number_of_seasons}")
+        logger.info(
+            f"开始处理: Title: {title}, Year:{year}, DBID:{douban_id}, Type:{mtype}"
+        )
+        # 元数据
+        meta = MetaInfo(title)
+        meta.year = year
+        if mtype:
+            meta.type = mtype
+        logger.debug(f"MetaInfo meta from rss_info title:::{meta}")
+
+        prepared: PreparedRankItem = {
+            "item": rank_item,
+            "meta": meta,
+            "mediainfo": None,
+            "skip": False,
+            "filter_status": None,
+            "is_exist_all": False,
+            "missing_season": None,
+        }
 
-                    # 已识别状态默认值
-                    status = Status.UNCATEGORIZED
+        # 识别前先按榜单和识别缓存中已有的类型、年份和评分过滤，避免请求TMDB和媒体服务器
+        if self.__pre_filter_rank_item(prepared, subscription_type):
+            return prepared
 
-                    # 查询缺失的媒体信息
-                    is_exist_all, missing_season = self.__check_lib_exists(
-                        meta, mediainfo, mediainfo.type == MediaType.MOVIE
-                    )
+        # 不请求豆瓣 API，直接利用 RSS 现有的 Title 和 Year 进行 TMDB 文本识别
+        logger.info(f"绕过豆瓣 API，直接通过文本识别: Title: {title}, Year: {year}")
+        mediainfo = self.__recognize_media(
+            meta=meta, title=title, year=year, mtype=mtype
+        )
+        if not mediainfo:
+            logger.warn(f"未识别到 {title} 的媒体信息")
+            return prepared
+        prepared["mediainfo"] = mediainfo
+
+        logger.debug(f"{meta}:::{meta}")
+        logger.info(
+            f"已识别到 {title} ({year}) 的媒体信息: {mediainfo.title_year}, 类型: {mediainfo.type}"
+        )
 
-                    logger.debug(
-                        f"is_exist_all:::{is_exist_all}, missing_season:::{missing_season}"
-                    )
+        if self.__is_type_excluded(
+            mediainfo.type, subscription_type, mediainfo.title_year
+        ):
+            prepared["skip"] = True
+            return prepared
 
-                    # 如果是剧集且开启全季订阅，则轮流下载每一季
-                    if (
-                        self._is_seasons_all
-                        and mediainfo.type == MediaType.TV
-                        and number_of_seasons
-                        and not is_exist_all
-                    ):
-                        logger.debug(
-                            f"meta.begin_season:::{meta.begin_season}"
-                        )
-                        genre_ids = mediainfo.genre_ids
-                        ANIME_GENRE_ID = 16
-                        logger.debug(
-                            f"{mediainfo.title_year} genre_ids::: {genre_ids}"
-                        )
-                        if (
-                            ANIME_GENRE_ID in genre_ids
-                            and customize_save_paths
-                            and isinstance(customize_save_paths, dict)
-                        ):
-                            save_path = customize_save_paths.get("anime")
-                            logger.info(
-                                f"{mediainfo.title_year} 为动漫类别, 动漫自定义保存路径为: {save_path}"
-                            )
+        # 年份和评分不符合要求时不再检查媒体库
+        prepared["filter_status"] = self.__check_media_filter(
+            mediainfo.title_year, mediainfo.year, mediainfo.vote_average
+        )
+        if prepared["filter_status"]:
+            if self._metrics:
+                self._metrics.add_saved_calls(["no_exists"])
+            return prepared
 
-                        for i in range(1, number_of_seasons + 1):
-                            logger.debug(
-                                f"开始添加 {mediainfo.title_year} 第{i}/{number_of_seasons}季订阅"
-                            )
-                            __status = self.__checke_and_add_subscribe(
-                                meta=meta,
-                                mediainfo=mediainfo,
-                                season=i,
-                                save_path=save_path,
-                                is_exist_all=is_exist_all,
-                                missing_season=missing_season,
-                            )
-                            if not meta.begin_season or i == meta.begin_season:
-                                status = __status
-                    else:
-                        status = self.__checke_and_add_subscribe(
-                            meta=meta,
-                            mediainfo=mediainfo,
-                            season=meta.begin_season,
-                            save_path=save_path,
-                            is_exist_all=is_exist_all,
-                            missing_season=missing_season,
-                        )
+        # 查询缺失的媒体信息
+        is_exist_all, missing_season = self.__check_lib_exists(
+            meta, mediainfo, mediainfo.type == MediaType.MOVIE
+        )
+        logger.debug(
+            f"is_exist_all:::{is_exist_all}, missing_season:::{missing_season}"
+        )
+        prepared["is_exist_all"] = is_exist_all
+        prepared["missing_season"] = missing_season
+        return prepared
 
-                    # 存储历史记录
-                    history_payload = {
-                        "title": title,
-                        "type": mediainfo.type.value,
-                        "year": mediainfo.year,
-                        "poster": mediainfo.get_poster_image(),
-                        "overview": mediainfo.overview,
-                        "tmdbid": str(mediainfo.tmdb_id) or "0",
-                        "doubanid": douban_id or "0",
-                        "unique": unique_flag,
-                        "time": datetime.datetime.now(
-                            tz=pytz.timezone(settings.TZ)
-                        ).strftime("%m-%d %H:%M"),
-                        "time_full": datetime.datetime.now(
-                            tz=pytz.timezone(settings.TZ)
-                        ).strftime("%Y-%m-%d %H:%M:%S"),
-                        "vote": mediainfo.vote_average,
-                        "status": status.value,
-                    }
-                    history.append(history_payload)
-                    unique_flags.add(unique_flag)
-                    logger.debug(f"已添加到历史：{history_payload}")
+    def __pre_filter_rank_item(
+        self, prepared: PreparedRankItem, subscription_type: str | None
+    ) -> bool:
+        """
+        识别前按RSS和识别缓存中的类型、年份和评分过滤，返回是否已过滤
+        """
+        rank_item = prepared["item"]
+        title = rank_item["title"]
+        mtype = rank_item["mtype"]
+        year = rank_item["year"]
+        vote = None
+
+        # 识别缓存中有TMDB的类型、年份和评分时优先使用
+        key = RecognizeCache.get_key(title, year, mtype)
+        entry = self._recognize_cache.peek(key) if self._recognize_cache else None
+        if entry and entry.get("tmdbid"):
+            if entry.get("mtype"):
+                mtype = MediaType(entry["mtype"])
+            year = entry.get("year") or year
+            vote = entry.get("vote")
+
+        if self.__is_type_excluded(mtype, subscription_type, title):
+            prepared["skip"] = True
+            saved_calls = []
+        else:
+            prepared["filter_status"] = self.__check_media_filter(
+                title, year, vote
+            )
+            if not prepared["filter_status"]:
+                return False
+            saved_calls = ["no_exists"]
 
-            except Exception as e:
-                logger.error(f"处理RSS地址：{addr} 出错: {str(e)}")
-            finally:
-                # 保存历史记录
-                logger.info(f"保存榜单 {addr} 处理后的历史记录")
+        # 没有可用的识别缓存时会请求识别
+        if not entry or (
+            entry.get("tmdbid") and not self._recognize_cache.get_media(key)
+        ):
+            saved_calls.append("recognize")
+        if self._metrics:
+            self._metrics.add_saved_calls(saved_calls, prefiltered=True)
+        return True
+
+    def __is_type_excluded(
+        self,
+        mtype: MediaType | None,
+        subscription_type: str | None,
+        title_year: str,
+    ) -> bool:
+        """
+        判断媒体类型是否被仅订阅电影或榜单的订阅类型排除
+        """
+        if mtype == MediaType.TV and (
+            self._is_only_movies or subscription_type == "movies"
+        ):
+            logger.info(f"仅下载电影，跳过 {title_year}")
+            return True
+        if mtype == MediaType.MOVIE and subscription_type == "tv":
+            logger.info(f"仅下载剧集，跳过 {title_year}")
+            return True
+        return False
+
+    def __recognize_media(
+        self,
+        meta: MetaBase,
+        title: str,
+        year: str | None,
+        mtype: MediaType | None,
+    ) -> MediaInfo | None:
+        """
+        识别媒体信息，优先使用识别缓存
+        """
+        if not self._recognize_cache:
+            return self.__chain_recognize_media(meta=meta)
+
+        key = RecognizeCache.get_key(title, year, mtype)
+        entry = self._recognize_cache.get(key)
+        if self._metrics:
+            self._metrics.add_cache_lookup(bool(entry))
+        if entry:
+            if not entry.get("tmdbid"):
+                logger.info(f"识别缓存：{title} ({year}) 此前未识别到媒体信息")
+                return None
+            mediainfo = self._recognize_cache.get_media(key)
+            if mediainfo:
+                return mediainfo
+            # 按缓存的TMDB ID识别，避免再次按名称搜索
+            cached_mtype = entry.get("mtype")
+            mediainfo = self.__chain_recognize_media(
+                meta=meta,
+                mtype=MediaType(cached_mtype) if cached_mtype else mtype,
+                tmdbid=entry.get("tmdbid"),
+            )
+        else:
+            mediainfo = self.__chain_recognize_media(meta=meta)
 
-                self.save_data("history", history)
+        self._recognize_cache.set(key, mediainfo)
+        return mediainfo
 
-        logger.info("所有榜单RSS刷新完成")
+    def __chain_recognize_media(self, **kwargs) -> MediaInfo | None:
+        """
+        限流后调用识别，并统计识别耗时
+        """
+        self.__rate_limit("tmdb")
+        with self.__stage("recognize"):
+            return self.chain.recognize_media(**kwargs)
 
     def __check_lib_exists(
         self,
@@ -1600,11 +3871,12 @@ class DoubanRankPlus2(_PluginBase):
         @return: True: 媒体库中已存在 False: 媒体库中不存在; list[int]: 缺失的季
         """
         # 查询缺失的媒体信息
-        is_exist_flag, no_exist_details = (
-            self.downloadchain.get_no_exists_info(
-                meta=meta, mediainfo=mediainfo
+        with self.__stage("no_exists"):
+            is_exist_flag, no_exist_details = (
+                self.downloadchain.get_no_exists_info(
+                    meta=meta, mediainfo=mediainfo
+                )
             )
-        )
         logger.debug(f"is_exist_flag:::{is_exist_flag}")
         logger.debug(f"no_exist_detail:::{no_exist_details}")
 
@@ -1627,6 +3899,102 @@ class DoubanRankPlus2(_PluginBase):
                 logger.debug(f"缺失季: {missing_seasons}")
                 return missing_seasons is None, missing_seasons
 
+    def __check_media_filter(
+        self, title_year: str, year: str | None, vote: float | None
+    ) -> Status | None:
+        """
+        检查上映年份和评分，不符合要求时返回对应状态，未知的年份和评分不过滤
+        """
+        # 判断上映年份是否符合要求
+        if (
+            self._release_year
+            and str(year or "").isdigit()
+            and int(year) < int(self._release_year)
+        ):
+            logger.info(f"{title_year} 上映年份: {year}, 不符合要求")
+            return Status.YEAR_NOT_MATCH
+        # 判断评分是否符合要求
+        if self._vote and vote is not None and vote < self._vote:
+            logger.info(f"{title_year} 评分: {vote}, 不符合要求")
+            return Status.RATING_NOT_MATCH
+        return None
+
+    def __checke_and_add_subscribes(
+        self,
+        meta: MetaBase,
+        mediainfo: MediaInfo,
+        seasons: List[int],
+        save_path,
+        is_exist_all: bool,
+        missing_season: list[int] | None,
+    ) -> Dict[int, Status]:
+        """
+        批量添加剧集多季订阅，已有订阅只查询一次
+        @return: 每一季的处理状态
+        """
+        if is_exist_all:
+            logger.debug(f"{mediainfo.title_year} 媒体库中已存在，跳过订阅")
+            return {season: Status.MEDIA_EXISTS for season in seasons}
+
+        seasons_status: Dict[int, Status] = {}
+        if missing_season:
+            logger.debug(f"{mediainfo.title_year} 缺失季: {missing_season}")
+            for season in seasons:
+                if season not in missing_season:
+                    seasons_status[season] = Status.MEDIA_EXISTS
+            exists_seasons = sorted(seasons_status)
+            if exists_seasons:
+                logger.info(
+                    f"{mediainfo.title_year} 第 {exists_seasons} 季媒体库中已存在，跳过订阅"
+                )
+
+        pending_seasons = [s for s in seasons if s not in seasons_status]
+        if not pending_seasons:
+            return seasons_status
+
+        if save_path:
+            logger.info(
+                f"{mediainfo.title_year} 的自定义保存路径为: {save_path}"
+            )
+
+        # 一次查询该媒体已订阅的季
+        subscribed_seasons = {
+            subscribe.season
+            for subscribe in self.subscribeoper.list_by_tmdbid(
+                mediainfo.tmdb_id
+            )
+            or []
+        }
+
+        added_seasons = []
+        for season in pending_seasons:
+            if season in subscribed_seasons:
+                seasons_status[season] = Status.SUBSCRIPTION_EXISTS
+                continue
+            self.subscribechain.add(
+                title=mediainfo.title,
+                year=mediainfo.year,
+                mtype=mediainfo.type,
+                tmdbid=mediainfo.tmdb_id,
+                season=season,
+                exist_ok=True,
+                username=self.plugin_name,
+                save_path=save_path,
+            )
+            seasons_status[season] = Status.SUBSCRIPTION_ADDED
+            added_seasons.append(season)
+
+        exists_seasons = sorted(set(pending_seasons) & subscribed_seasons)
+        if exists_seasons:
+            logger.info(
+                f"{mediainfo.title_year} 第 {exists_seasons} 季订阅已存在"
+            )
+        if added_seasons:
+            logger.info(
+                f"已添加订阅: {mediainfo.title_year} 第 {added_seasons} 季"
+            )
+        return seasons_status
+
     def __checke_and_add_subscribe(
         self,
         meta: MetaBase,
@@ -1661,21 +4029,6 @@ class DoubanRankPlus2(_PluginBase):
                 f"{mediainfo.title_year} 的自定义保存路径为: {save_path}"
             )
 
-        # 判断上映年份是否符合要求
-        if self._release_year and int(mediainfo.year) < int(
-            self._release_year
-        ):
-            logger.info(
-                f"{mediainfo.title_year} 上映年份: {mediainfo.year}, 不符合要求"
-            )
-            return Status.YEAR_NOT_MATCH
-        # 判断评分是否符合要求
-        if self._vote and mediainfo.vote_average < self._vote:
-            logger.info(
-                f"{mediainfo.title_year} 评分: {mediainfo.vote_average}, 不符合要求"
-            )
-            return Status.RATING_NOT_MATCH
-
         # 查询缺失的媒体信息
         # exist_flag, _exist_details = self.downloadchain.get_no_exists_info(
         #     meta=meta, mediainfo=mediainfo
@@ -1707,165 +4060,283 @@ class DoubanRankPlus2(_PluginBase):
             logger.info(f"已添加订阅: {mediainfo.title_year} ")
         return Status.SUBSCRIPTION_ADDED
 
-    def __get_rss_info(self, addr) -> List[RssInfo]:
+    def __get_rss_infos(
+        self, addrs: List[str], caches: List[FeedCache | None]
+    ) -> List[RssFetchResult]:
         """
-        获取RSS
+        并发获取多个RSS，限制总线程数和同一主机的并发数，按输入顺序返回
         """
-        try:
-            if self._proxy:
-                ret = RequestUtils(
-                    timeout=240, proxies=settings.PROXY or {}
-                ).get_res(addr)
-            else:
-                ret = RequestUtils(timeout=240).get_res(addr)
-            if not ret:
-                return []
-            ret_xml = ret.text
-            ret_array: List[RssInfo] = []
-
-            # 解析XML
-            dom_tree = xml.dom.minidom.parseString(ret_xml)
-            rootNode = dom_tree.documentElement
-            if rootNode is None:
-                return []
-            items = rootNode.getElementsByTagName("item")
-            for item in items:
-                try:
-                    # 标题
-                    title = DomUtils.tag_value(item, "title", default="")
-                    # 链接
-                    link = DomUtils.tag_value(item, "link", default="")
-                    if not title and not link:
-                        logger.warn("条目标题和链接均为空，无法处理")
-                        continue
-
-                    # 豆瓣ID
-                    found_doubanid = re.findall(r"/(\d+)/", str(link) or "")
-                    if found_doubanid:
-                        doubanid = found_doubanid[0]
-                        if not str(doubanid).isdigit():
-                            logger.warn(f"解析的豆瓣ID格式不正确：{doubanid}")
-                            continue
-                    else:
-                        doubanid = None
-
-                    # 年份
-                    year = DomUtils.tag_value(item, "year", default="")
-                    if not year:
-                        # 年份
-                        description = DomUtils.tag_value(
-                            item, "description", default=""
-                        )
-                        # 删除 '评价数' 到第一个 '<br>' 之间的字符串
-                        description = re.sub(
-                            r"评价数.*?<br>", "", str(description) or ""
-                        )
-                        # 删除所有 <img> 标签及其内容
-                        description = re.sub(r"<img.*?>", "", description)
-                        # 匹配4位独立数字1900-2099年
-                        found_year = re.findall(
-                            r"\b(19\d{2}|20\d{2})\b", description
-                        )
-                        year = found_year[0] if found_year else None
+        if not addrs:
+            return []
 
-                    # 类型
-                    mtype = DomUtils.tag_value(item, "type", default="")
+        host_semaphores: Dict[str, Semaphore] = {}
+        for addr in addrs:
+            host = urlparse(addr).netloc
+            if host not in host_semaphores:
+                host_semaphores[host] = Semaphore(self._rss_fetch_per_host)
+
+        def __fetch(addr: str, cache: FeedCache | None) -> RssFetchResult:
+            if self._event.is_set():
+                return {"rss_infos": [], "cache": None, "not_modified": False}
+            with host_semaphores[urlparse(addr).netloc]:
+                logger.info(f"获取RSS：{addr} ...")
+                return self.__get_rss_info(addr, cache)
+
+        max_workers = max(1, min(self._rss_fetch_workers, len(addrs)))
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="doubanrankplus-rss"
+        ) as executor:
+            return list(executor.map(__fetch, addrs, caches))
+
+    def __get_feed_filter_hash(self, spec: FeedSpec) -> str:
+        """
+        获取榜单处理条件的摘要，条件变化后榜单缓存失效
+        """
+        feed_filter = {
+            "addr": {
+                "addr": spec["url"],
+                "customize_save_paths": spec["save_paths"],
+                "subscription_type": spec["subscription_type"],
+            },
+            "vote": self._vote,
+            "release_year": self._release_year,
+            "is_only_movies": self._is_only_movies,
+            "is_seasons_all": self._is_seasons_all,
+        }
+        return hashlib.md5(
+            json.dumps(feed_filter, sort_keys=True, ensure_ascii=False).encode()
+        ).hexdigest()
 
-                    rss_info: RssInfo = {
-                        "title": str(title),
-                        "link": str(link),
-                        "mtype": str(mtype),
-                        "year": str(year) if year else None,
-                        "doubanid": str(doubanid) if doubanid else None,
+    def __get_rss_info(
+        self, addr, cache: FeedCache | None = None
+    ) -> RssFetchResult:
+        """
+        获取RSS，带有缓存时发送条件请求，内容未变化时不再解析。
+        有效期内刚获取过的地址直接使用共享的内容
+        """
+        result: RssFetchResult = {
+            "rss_infos": [],
+            "cache": None,
+            "not_modified": False,
+        }
+        try:
+            with _shared_feed_cache.lock(addr):
+                shared_feed = _shared_feed_cache.get(addr)
+                if shared_feed:
+                    logger.info(f"RSS地址：{addr} 使用共享的RSS内容")
+                else:
+                    headers = {"User-Agent": settings.USER_AGENT}
+                    if cache:
+                        if cache.get("etag"):
+                            headers["If-None-Match"] = str(cache.get("etag"))
+                        if cache.get("last_modified"):
+                            headers["If-Modified-Since"] = str(
+                                cache.get("last_modified")
+                            )
+                    self.__rate_limit("rsshub")
+                    with self.__stage("fetch"):
+                        ret = self.__get_http().get(
+                            addr,
+                            proxy=self._proxy,
+                            headers=headers,
+                            timeout=240,
+                        )
+                    if not ret:
+                        return result
+                    if cache and ret.status_code == 304:
+                        logger.info(f"RSS地址：{addr} 未更新")
+                        result["not_modified"] = True
+                        return result
+                    shared_feed = {
+                        "etag": ret.headers.get("ETag"),
+                        "last_modified": ret.headers.get("Last-Modified"),
+                        "hash": hashlib.md5(ret.content).hexdigest(),
+                        "content": ret.content,
+                        "rss_infos": None,
+                        "time": time.time(),
                     }
-                    # 返回对象
-                    ret_array.append(rss_info)
+                    _shared_feed_cache.set(addr, shared_feed)
+
+                body_hash = shared_feed["hash"]
+                if cache and cache.get("hash") == body_hash:
+                    logger.info(f"RSS地址：{addr} 内容与上次一致")
+                    result["not_modified"] = True
+                    return result
+
+                # 共享的解析结果只读，不修改
+                if shared_feed["rss_infos"] is None:
+                    with self.__stage("parse"):
+                        shared_feed["rss_infos"] = self.__parse_rss_info(
+                            shared_feed["content"]
+                        )
+                rss_infos = shared_feed["rss_infos"]
+            # RSS中的生成时间等字段每次可能不同，按条目再比较一次
+            items_hash = hashlib.md5(
+                json.dumps(
+                    [(i["title"], i["link"]) for i in rss_infos],
+                    ensure_ascii=False,
+                ).encode()
+            ).hexdigest()
+
+            result["cache"] = {
+                "etag": shared_feed["etag"],
+                "last_modified": shared_feed["last_modified"],
+                "hash": body_hash,
+                "items_hash": items_hash,
+                "filter": "",
+                "time": datetime.datetime.now(
+                    tz=pytz.timezone(settings.TZ)
+                ).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            if cache and cache.get("items_hash") == items_hash:
+                logger.info(f"RSS地址：{addr} 条目与上次一致")
+                result["not_modified"] = True
+                return result
 
-                except Exception as e1:
-                    logger.error("解析RSS条目失败：" + str(e1))
-                    continue
-            return ret_array
+            result["rss_infos"] = rss_infos
+            return result
         except Exception as e:
             logger.error("获取RSS失败：" + str(e))
-            return []
+            return result
 
     @staticmethod
-    def __get_info_addr(
-        addr: str,
-    ) -> Dict[str, Dict[str, str] | str | None]:
-        # ) -> Dict[str, Dict[str, str] | str | None]:
-        subscription_type = None
-
-        # 提取分号分割的链接和保存地址
-        if ";" not in addr:
-            return {
-                "addr": addr,
-                "customize_save_paths": None,
-                "subscription_type": None,
-            }
-        else:
-            logger.debug("分割订阅地址")
-            str_list: List[str] = addr.split(";")
-            addr = str_list[0]
-            customize_save_info = str_list[1] if len(str_list) > 1 else ""
-            if len(str_list) > 2:
-                subscription_type = str_list[2]
-
-            logger.debug(f"addr: {addr}")
-            logger.debug(f"customize_save_info: {customize_save_info}")
-            logger.debug(f"subscription_type: {subscription_type}")
+    def __parse_rss_info(content: bytes) -> List[RssInfo]:
+        """
+        解析RSS
+        """
+        try:
+            return list(DoubanRankPlus2.__iter_rss_info(content))
+        except Exception as e:
+            logger.error("解析RSS失败：" + str(e))
+            return []
 
-            if "#" in customize_save_info:
-                customize_save_info_list = customize_save_info.split("#")
+    @staticmethod
+    def __iter_rss_info(content: bytes) -> Iterator[RssInfo]:
+        """
+        流式解析RSS，每个条目解析完成后立即返回并释放对应的节点
+        """
+        parents: List[ElementTree.Element] = []
+        for event, elem in ElementTree.iterparse(
+            io.BytesIO(content), events=("start", "end")
+        ):
+            if event == "start":
+                parents.append(elem)
+                continue
 
-                logger.debug(
-                    f"customize_save_info_list: {customize_save_info_list}"
-                )
+            parents.pop()
+            if elem.tag != "item":
+                continue
+            try:
+                rss_info = DoubanRankPlus2.__get_rss_item_info(elem)
+                if rss_info:
+                    yield rss_info
+            except Exception as e1:
+                logger.error("解析RSS条目失败：" + str(e1))
+            finally:
+                # 释放已解析的条目
+                elem.clear()
+                if parents:
+                    parents[-1].remove(elem)
 
-                customize_save_path_movie = customize_save_info_list[0]
-                customize_save_path_tv = customize_save_info_list[1]
-                customize_save_path_anime = (
-                    customize_save_info_list[2]
-                    if len(customize_save_info_list) > 2
-                    else customize_save_path_tv
-                )
+    @staticmethod
+    def __get_rss_item_info(item: ElementTree.Element) -> RssInfo | None:
+        """
+        解析RSS条目
+        """
+        # 取每个标签第一次出现的文本
+        fields: Dict[str, str] = {}
+        for child in item:
+            fields.setdefault(str(child.tag), child.text or "")
+
+        # 标题
+        title = fields.get("title", "")
+        # 链接
+        link = fields.get("link", "")
+        if not title and not link:
+            logger.warn("条目标题和链接均为空，无法处理")
+            return None
+
+        # 豆瓣ID
+        found_doubanid = DOUBAN_ID_PATTERN.findall(link)
+        if found_doubanid:
+            doubanid = found_doubanid[0]
+            if not str(doubanid).isdigit():
+                logger.warn(f"解析的豆瓣ID格式不正确：{doubanid}")
+                return None
+        else:
+            doubanid = None
 
-                logger.debug(
-                    f"订阅链接 {addr} 的自定义保存路径为: "
-                    f"电影:{customize_save_path_movie}, "
-                    f"电视剧: {customize_save_path_tv}, "
-                    f"动漫: {customize_save_path_anime}"
-                )
+        # 年份
+        year = fields.get("year", "")
+        if not year:
+            description = fields.get("description", "")
+            # 删除 '评价数' 到第一个 '<br>' 之间的字符串
+            description = DESCRIPTION_VOTES_PATTERN.sub("", description)
+            # 删除所有 <img> 标签及其内容
+            description = DESCRIPTION_IMG_PATTERN.sub("", description)
+            # 匹配4位独立数字1900-2099年
+            found_year = YEAR_PATTERN.findall(description)
+            year = found_year[0] if found_year else None
+
+        # 类型
+        mtype = fields.get("type", "")
 
-            else:
-                customize_save_path_movie = customize_save_info
-                customize_save_path_tv = customize_save_info
-                customize_save_path_anime = customize_save_info
+        return {
+            "title": title,
+            "link": link,
+            "mtype": mtype,
+            "year": str(year) if year else None,
+            "doubanid": str(doubanid) if doubanid else None,
+        }
 
-                logger.debug(
-                    f"订阅链接 {addr} 的自定义保存路径为: {customize_save_info}"
-                )
+    @staticmethod
+    def __parse_feed_spec(
+        line: str,
+    ) -> Tuple[FeedSpec | None, str | None, str | None]:
+        """
+        解析一行榜单地址配置，格式为 地址;电影#电视剧#动漫保存路径;@订阅类型@，
+        返回 (榜单配置, 错误信息, 警告信息)
+        """
+        parts = [part.strip() for part in line.split(";")]
+        url = parts[0]
+        if not url.startswith(("http://", "https://")):
+            return None, f"{url} 不是有效的RSS地址", None
+        if len(parts) > 3:
+            return None, f"{url} 的配置最多包含地址、保存路径和订阅类型三项", None
+
+        # 只有一个保存路径时电影、电视剧和动漫共用，未设置动漫路径时与电视剧相同
+        save_paths = None
+        if len(parts) > 1:
+            paths = [path.strip() for path in parts[1].split("#")]
+            if len(paths) > 3:
+                return None, f"{url} 的保存路径最多为 电影#电视剧#动漫 三项", None
+            movie_path = paths[0]
+            tv_path = paths[1] if len(paths) > 1 else movie_path
+            save_paths = {
+                "movie": movie_path,
+                "tv": tv_path,
+                "anime": paths[2] if len(paths) > 2 else tv_path,
+            }
 
-            if (
-                subscription_type
-                and subscription_type.startswith("@")
-                and subscription_type.endswith("@")
-            ):
-                subscription_type = subscription_type.strip("@")
-                logger.info(
-                    f"订阅链接 {addr} 的订阅类型为: {subscription_type}"
-                )
+        subscription_type = parts[2] if len(parts) > 2 else ""
+        if subscription_type.startswith("@") and subscription_type.endswith("@"):
+            subscription_type = subscription_type.strip("@")
+        # 未知的订阅类型按未设置处理，与旧版本一致，不过滤订阅类型
+        warning = None
+        if subscription_type and subscription_type not in ("movies", "tv"):
+            warning = (
+                f"{url} 的订阅类型 {subscription_type} 无效，只能为 @movies@ 或 @tv@，"
+                f"已按不限订阅类型处理"
+            )
+            subscription_type = ""
 
-            customize_save_paths = {
-                "movie": customize_save_path_movie,
-                "tv": customize_save_path_tv,
-                "anime": customize_save_path_anime,
-            }
-            return {
-                "addr": addr,
-                "customize_save_paths": customize_save_paths,
-                "subscription_type": subscription_type,
-            }
+        return {
+            "id": hashlib.md5(url.encode()).hexdigest()[:12],
+            "url": url,
+            "save_paths": save_paths,
+            "subscription_type": subscription_type or None,
+            "filter": "",
+        }, None, warning
 
     @staticmethod
     def __get_history_unrecognized_payload(
@@ -1873,14 +4344,15 @@ class DoubanRankPlus2(_PluginBase):
         unique: str,
         year: str | None = None,
         doubanid: str | None = None,
+        status: Status = Status.UNRECOGNIZED,
     ) -> HistoryPayload:
         """
-        获取历史记录
+        获取未识别媒体信息的历史记录
         """
         history_payload: HistoryPayload = {
             "title": title,
             "unique": unique,
-            "status": Status.UNRECOGNIZED.value,
+            "status": status.value,
             "type": MediaType.UNKNOWN.value,
             "year": year or "0",
             "poster": "/assets/no-image-CweBJ8Ee.jpeg",
@@ -2046,7 +4518,7 @@ class DoubanRankPlus2(_PluginBase):
         logger.info(f"开始从原MP获取数据，【请求URL】：{migrate_url}")
 
         try:
-            res = RequestUtils().request(method="get", url=migrate_url)
+            res = self.__get_http().get(migrate_url)
             if not res:
                 logger.error(
                     "没有获取到原MP信息，检查原MP地址和API Token是否正确，检查浏览器打开【请求URL】查看是能获取到数据"
@@ -2089,12 +4561,47 @@ class DoubanRankPlus2(_PluginBase):
         """
         return f"{self._migrate_from_url}/api/v1/plugin/{self._plugin_id}/{endpoint}?migrate_api_token={self._migrate_api_token}"
 
-    def __get_migrate_history(self):
+    def __migrate_history(self) -> bool:
         """
-        获取所有迁移历史记录
+        分页获取原MP的历史记录并按 unique 合并到本地，每页完成后记录进度，中断后从进度继续
         """
-        url = self.__get_migrate_plugin_api_url("migrate-history")
-        return self.__get_migrate_info(url)
+        if not self._history:
+            return False
+        checkpoint: MigrateCheckpoint | None = self.get_data(
+            "migrate_checkpoint"
+        )
+        if not checkpoint or checkpoint.get("source") != self._migrate_from_url:
+            checkpoint = {"source": self._migrate_from_url, "after": 0, "count": 0}
+        elif checkpoint.get("after"):
+            logger.info(
+                f"从上次的进度继续迁移历史记录，已迁移 {checkpoint['count']} 条"
+            )
+
+        while True:
+            if self._event.is_set():
+                return False
+            url = (
+                self.__get_migrate_plugin_api_url("migrate-history")
+                + f"&after={checkpoint['after']}&limit={self._migrate_page_size}"
+            )
+            page = self.__get_migrate_info(url)
+            if isinstance(page, list):
+                # 原MP的插件版本不支持分页，一次返回全部记录
+                checkpoint["count"] += self._history.add_many(page)
+                break
+            if not isinstance(page, dict) or "items" not in page:
+                # 保留进度，下次运行时继续
+                return False
+            checkpoint["count"] += self._history.add_many(page["items"])
+            if not page.get("next"):
+                break
+            checkpoint["after"] = page["next"]
+            self.save_data("migrate_checkpoint", checkpoint)
+            logger.info(f"已迁移 {checkpoint['count']} 条历史记录")
+
+        self.del_data("migrate_checkpoint")
+        logger.info(f"历史记录迁移完成，共 {checkpoint['count']} 条")
+        return checkpoint["count"] > 0
 
     def __get_migrate_config(self):
         """